@@ -1,19 +1,69 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+import json
+import time
+import base64
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, Header
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
 from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, tuple_
 from sqlalchemy.orm import selectinload
 from datetime import datetime, timezone
 
-from app.core.database import get_db
-from app.models import Interview
-from app.schemas import InterviewRead, InterviewFullRead
-from app.services.feedback import generate_feedback
-import asyncio
+from app.core.database import get_db, AsyncSessionLocal
+from app.models import Interview, Feedback, UserStats
+from app.schemas import InterviewRead, InterviewFullRead, InterviewListItem, FeedbackScores, UserStatsRead
+from app.services.session import SESSIONS
+from app.services.reaper import finalize_interview, cancel_reap
+from app.services.feedback import feedback_payload
+from app.services.notify import feedback_notifier
+from app.services.response_cache import interview_cache, make_etag, etag_matches
+from app.services.export import export_interviews, export_authorized
+from app.services.stats import summarize, OVERALL
 
 router = APIRouter()
 
+# Feedback written on any worker drops that interview's cached response here
+feedback_notifier.listeners.append(interview_cache.invalidate)
+
+FEEDBACK_WAIT_SEC = 300
+SSE_KEEPALIVE_SEC = 15
+
+LIST_PAGE_SIZE = 50
+LIST_MAX_PAGE_SIZE = 100
+
+# Only what the dashboard draws; feedbackText stays in the database
+LIST_COLUMNS = (
+    Interview.updatedAt, Interview.id, Interview.topic, Interview.duration, Interview.difficulty, Interview.seniority,
+    Interview.concept, Interview.status, Interview.startTime, Interview.endTime, Interview.createdAt,
+)
+SCORE_COLUMNS = (
+    Feedback.id.label("feedbackId"), Feedback.rating, Feedback.englishScore,
+    Feedback.technicalScore, Feedback.communicationScore,
+)
+
+LIST_ADAPTER = TypeAdapter(List[InterviewListItem])
+
+def encode_cursor(created_at: datetime, interview_id: str):
+    raw = f"{created_at.isoformat()}|{interview_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, interview_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), interview_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def list_item(row):
+    data = dict(row._mapping)
+    data.pop("updatedAt")
+    scores = {c.key: data.pop(c.key) for c in SCORE_COLUMNS}
+    scores["id"] = scores.pop("feedbackId")
+    return InterviewListItem(**data, feedback=FeedbackScores(**scores) if scores["id"] else None)
+
 class InterviewCreateRequest(BaseModel):
     topic: str
     duration: int
@@ -50,19 +100,93 @@ async def create_interview(req: InterviewCreateRequest, db: AsyncSession = Depen
     fetched_interview = result.scalars().first()
     return fetched_interview
 
-@router.get("", response_model=List[InterviewRead])
-async def list_interviews(userId: str, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(Interview)
+def json_response(body: bytes, etag: str, headers: dict = None):
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "private, no-cache", **(headers or {})},
+    )
+
+def not_modified(etag: str, headers: dict = None):
+    return Response(status_code=304, headers={"ETag": etag, **(headers or {})})
+
+@router.get("", response_model=List[InterviewListItem])
+async def list_interviews(
+    userId: str,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_MAX_PAGE_SIZE),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    One page of a user's interviews, newest first. The body is still a plain list;
+    the cursor for the next page comes back in the X-Next-Cursor header. The ETag
+    covers each row's updatedAt and feedback id, so an unchanged page is a 304.
+    """
+    query = (
+        select(*LIST_COLUMNS, *SCORE_COLUMNS)
+        .outerjoin(Feedback, Feedback.interviewId == Interview.id)
         .where(Interview.userId == userId)
-        .order_by(desc(Interview.createdAt))
-        .options(selectinload(Interview.feedback))
+        .order_by(desc(Interview.createdAt), desc(Interview.id))
+        .limit(limit + 1)
     )
-    items = result.scalars().all()
-    return items
+    if status:
+        query = query.where(Interview.status == status)
+    if cursor:
+        # Keyset: continue strictly after the last row of the previous page
+        created_at, last_id = decode_cursor(cursor)
+        query = query.where(tuple_(Interview.createdAt, Interview.id) < tuple_(created_at, last_id))
+
+    rows = (await db.execute(query)).all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].createdAt, rows[-1].id)
+
+    etag = make_etag(*(f"{r.id}|{r.updatedAt}|{r.feedbackId}" for r in rows))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, headers)
+    body = LIST_ADAPTER.dump_json([list_item(r) for r in rows])
+    return json_response(body, etag, headers)
+
+# Declared before /{interview_id} so "export" isn't taken for an id
+@router.get("/export")
+async def export_ndjson(
+    userId: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    status: Optional[str] = None,
+    authorization: Optional[str] = Header(None),
+):
+    """Matching interviews with questions and feedback as NDJSON, for admins holding EXPORT_ADMIN_TOKEN."""
+    if not export_authorized(authorization):
+        raise HTTPException(status_code=403, detail="Export requires the admin token")
+    return StreamingResponse(
+        export_interviews(user_id=userId, since=since, until=until, status=status),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="interviews.ndjson"'},
+    )
+
+@router.get("/stats", response_model=UserStatsRead)
+async def get_stats(userId: str, db: AsyncSession = Depends(get_db)):
+    """A user's progress, read from the rollups kept up to date as feedback is written."""
+    result = await db.execute(select(UserStats).where(UserStats.userId == userId))
+    rows = result.scalars().all()
+    # Feedback from before the rollups existed is folded in by `python -m app.services.stats --backfill`
+    overall = next((r for r in rows if (r.topic, r.difficulty) == OVERALL), None)
+    by_topic = sorted((summarize(r) for r in rows if r is not overall), key=lambda s: -s["interviews"])
+    return {"userId": userId, "overall": summarize(overall) if overall else None, "byTopic": by_topic}
 
 @router.get("/{interview_id}", response_model=InterviewFullRead)
-async def get_interview(interview_id: str, db: AsyncSession = Depends(get_db)):
+async def get_interview(interview_id: str, if_none_match: Optional[str] = Header(None),
+                        db: AsyncSession = Depends(get_db)):
+    # Finalized interviews are served from memory: no queries, no serialization
+    cached = interview_cache.get(interview_id)
+    if cached:
+        etag, body = cached
+        return not_modified(etag) if etag_matches(if_none_match, etag) else json_response(body, etag)
+
     result = await db.execute(
         select(Interview)
         .where(Interview.id == interview_id)
@@ -76,7 +200,15 @@ async def get_interview(interview_id: str, db: AsyncSession = Depends(get_db)):
     
     if not item:
         raise HTTPException(status_code=404, detail="Interview not found")
-    return item
+
+    body = InterviewFullRead.model_validate(item).model_dump_json().encode()
+    if item.status == "COMPLETED" and item.feedback:
+        # Final: the payload only changes if the row does, which invalidates the cache
+        etag = make_etag(item.id, item.updatedAt, item.feedback.id)
+        interview_cache.put(interview_id, etag, body)
+    else:
+        etag = make_etag(body)
+    return not_modified(etag) if etag_matches(if_none_match, etag) else json_response(body, etag)
 
 @router.post("/{interview_id}/finish")
 async def finish_interview(interview_id: str, db: AsyncSession = Depends(get_db)):
@@ -90,9 +222,73 @@ async def finish_interview(interview_id: str, db: AsyncSession = Depends(get_db)
     interview.status = "COMPLETED"
     interview.endTime = datetime.now(timezone.utc)
     await db.commit()
+    interview_cache.invalidate(interview_id)
     
-    # Trigger AI Feedback in background
-    # generate_feedback creates its own session, so we just pass the ID
-    asyncio.create_task(generate_feedback(interview_id))
+    # Trigger AI Feedback in background. A session still live (or tearing down)
+    # on this worker queues it from its teardown, once the transcript is flushed;
+    # otherwise finish it here (the queue and generate_feedback both drop duplicates).
+    session = SESSIONS.get(interview_id)
+    if session is not None:
+        session["finished"] = True
+    else:
+        cancel_reap(interview_id)
+        await finalize_interview(interview_id)
 
     return {"message": "Interview marked completed"}
+
+def sse(event: str, data: dict):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.get("/{interview_id}/feedback/events")
+async def feedback_events(interview_id: str):
+    """
+    Server-sent events for the results page: a single "feedback" event the
+    moment the Feedback row is committed (right away if it already is), or
+    "timeout" after FEEDBACK_WAIT_SEC. Waiting costs no database queries.
+    """
+    # Subscribe before looking, so a commit in between can't be missed
+    waiter = feedback_notifier.subscribe(interview_id)
+    try:
+        # Own session instead of get_db: nothing should hold a connection while the stream is open
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Interview.id, Feedback)
+                .outerjoin(Feedback, Feedback.interviewId == Interview.id)
+                .where(Interview.id == interview_id)
+            )
+            row = result.first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Interview not found")
+    except BaseException:
+        # No stream will own the subscription (404, DB error, client gone)
+        feedback_notifier.unsubscribe(interview_id, waiter)
+        raise
+    if row.Feedback is not None:
+        feedback_notifier.unsubscribe(interview_id, waiter)
+
+    async def stream():
+        try:
+            if row.Feedback is not None:
+                yield sse("feedback", feedback_payload(row.Feedback))
+                return
+            deadline = time.monotonic() + FEEDBACK_WAIT_SEC
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    yield sse("timeout", {"interview_id": interview_id})
+                    return
+                try:
+                    payload = await asyncio.wait_for(asyncio.shield(waiter), min(SSE_KEEPALIVE_SEC, remaining))
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse("feedback", payload)
+                return
+        finally:
+            feedback_notifier.unsubscribe(interview_id, waiter)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,17 +1,32 @@
 import os
 import json
 import time
+import uuid
 import asyncio
 import websockets
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from dotenv import load_dotenv
 from datetime import datetime, timezone
-from sqlalchemy import select, desc
-
-from app.services.session import SESSIONS
-from app.services.llm import ask_llm
-from app.services.tts import stream_inworld_tts_to_client
-from app.services.feedback import generate_feedback
+from sqlalchemy import select
+
+from app.services.session import SESSIONS, STATE_FIELDS, SESSION_LIVE_TTL_SEC, session_store, session_state
+from app.services.llm import stream_llm
+from app.services.tts import speak_text, speak_pending, stream_sentences_to_client, SentenceChunker, Playback, INWORLD_SAMPLE_RATE
+from app.services.tts_cache import pending_audio
+from app.services.audio_framing import AudioOutput
+from app.services.prompts import build_system_prompt, build_first_question, time_notes, CLOSING_REPLY, TIME_UP_REPLY, REPEAT_REPLY
+from app.services.speculation import SpeculativeReply, SPECULATIVE_LLM
+from app.services.scheduler import SessionTimers
+from app.services.vad import VoiceActivityDetector, VAD_ENABLED
+from app.services.audio_buffer import AudioGate
+from app.services.transcript import TranscriptWriter
+from app.services.scoring import schedule_scoring
+from app.services.history import ConversationHistory
+from app.services.feedback_queue import feedback_queue
+from app.services.metrics import metrics, TurnTrace
+from app.services.diagnostics import tag_session, note_turn, forget_session
+from app.services.capacity import capacity, admit_interview
+from app.services.reaper import schedule_reap, cancel_reap, finalize_interview
 from app.core.database import AsyncSessionLocal
 from app.models import Interview, Question
 
@@ -19,7 +34,7 @@ load_dotenv()
 
 router = APIRouter()
 
-ASSEMBLYAI_URL = "wss://streaming.assemblyai.com/v3/ws"
+ASSEMBLYAI_URL = os.getenv("ASSEMBLYAI_URL", "wss://streaming.assemblyai.com/v3/ws")
 ASSEMBLYAI_API_KEY = os.getenv("ASSEMBLYAI_API_KEY")
 
 SAMPLE_RATE = 16000
@@ -28,9 +43,24 @@ MAX_READING_TIME = 8.0
 READING_MS_PER_CHAR = 0.04
 THINKING_DELAY = 1.0 # Reduced delay for snapier checks
 
+async def retire(session: dict):
+    """Ends an older connection to the same interview; its teardown checkpoints for the newer one."""
+    if not session["closing"]:
+        session["superseded"] = True
+        session["task"].cancel()
+    await asyncio.wait({session["task"]})
+
 @router.websocket("/ws/interview")
-async def interview_ws(ws: WebSocket, interview_id: str):
+async def interview_ws(ws: WebSocket, interview_id: str, audio_format: str = "wav"):
     await ws.accept()
+    # TTS audio framing chosen by the client: wav (default), pcm16 or mulaw
+    audio_out = AudioOutput(ws, audio_format, INWORLD_SAMPLE_RATE)
+
+    # Reconnected before the old socket on this worker noticed the drop: retire it
+    # first, so its state is saved for this connection instead of torn down under it
+    previous = SESSIONS.get(interview_id)
+    if previous is not None:
+        await retire(previous)
     
     # Check if interview exists and is actually playable
     async with AsyncSessionLocal() as db:
@@ -45,8 +75,24 @@ async def interview_ws(ws: WebSocket, interview_id: str):
             await ws.close(code=4000, reason="Interview already completed")
             return
 
-        # Update StartTime if first run
+    # Back within the grace period: the interview is not reaped
+    resuming = interview.startTime is not None
+    cancel_reap(interview_id)
+
+    # Reconnects to an interview already under way are admitted ahead of new ones;
+    # past capacity the socket is closed with 1013 and an estimated wait
+    admission = await admit_interview(ws, interview_id, resuming=resuming)
+    if admission is None:
+        if resuming:
+            schedule_reap(interview_id)
+        return
+    # Safety net: the slot goes back when this connection's task ends, whatever the exit path
+    asyncio.current_task().add_done_callback(lambda _: admission.release())
+
+    async with AsyncSessionLocal() as db:
+        # Update StartTime if first run (after admission, so time spent queued doesn't count)
         if not interview.startTime:
+            interview = await db.merge(interview)
             interview.startTime = datetime.now(timezone.utc)
             interview.status = "IN_PROGRESS"
             await db.commit()
@@ -65,195 +111,379 @@ async def interview_ws(ws: WebSocket, interview_id: str):
 
     # Calculate initial elapsed time
     
-    SYSTEM_PROMPT = f"""You are an AI technical interviewer conducting a {interview_seniority or 'Mid-Level'} interview about {interview_topic}.
-    Difficulty: {interview_difficulty}.
-    """
-    if interview_concept:
-        SYSTEM_PROMPT += f"\nFocus specifically on checking knowledge of: {interview_concept}."
-
-    SYSTEM_PROMPT += """
-    \nRules:
-    - Ask exactly ONE question at a time.
-    - Keep questions short.
-    - Never teach, hint, explain, or correct.
-    - Explore different concepts within the domain; do not stay on one topic.
-    - You may ask at most ONE follow-up question based on the previous answer.
-    - Do not ask multiple follow-ups on the same concept.
-    - If the candidate struggles, switch to a simpler or adjacent concept without explanation.
-    - Keep questions concise and neutral.
-    """
-
-    FIRST_QUESTION = f"Hello. I'm your AI interviewer. Let's start with a interview about {interview_topic}."
-    
-    if interview_concept:
-        FIRST_QUESTION += f" We may touch on concepts related to {interview_concept}."
-    FIRST_QUESTION += " Let’s begin. Please briefly introduce yourself."
+    SCORING_CONTEXT = {
+        "topic": interview_topic,
+        "seniority": interview_seniority or "Mid-Level",
+        "difficulty": interview_difficulty,
+    }
+    SYSTEM_PROMPT = build_system_prompt(interview_topic, interview_seniority, interview_difficulty, interview_concept)
+    FIRST_QUESTION = build_first_question(interview_topic, interview_concept)
 
 
     sid = interview_id
-    SESSIONS[sid] = {
-        "history": [{"role": "system", "content": SYSTEM_PROMPT}],
+    # Tags this interview's tasks for loop diagnostics and the fair LLM queue
+    tag_session(sid)
+    timers = SessionTimers()
+    vad = VoiceActivityDetector(SAMPLE_RATE) if VAD_ENABLED else None
+    gate = AudioGate(SAMPLE_RATE)
+    checkpoint_lock = asyncio.Lock()
+    # Identifies this connection; a newer one to the same interview takes over from it
+    token = uuid.uuid4().hex
+    session = {
+        "token": token,
+        "task": asyncio.current_task(),
+        "superseded": False,
+        "closing": False,
+        "finished": False,  # set by /finish
+        "history": ConversationHistory(SYSTEM_PROMPT),
         "buffer": [],
         "last_voice_ts": None,
         "processing_ai": False,
         "ai_end_ts": None,
         "reading_time": 0,
-        "tts_task": None,
+        "playback": None,
+        "trace": None,
+        "speculation": None,
     }
+    # Created once the transcript has been read (inside the try below)
+    writer = None
+    heartbeat_task = None
+
+    def owns_session():
+        entry = SESSIONS.get(sid)
+        return entry is not None and entry["token"] == token
+
+    async def checkpoint():
+        # Serializable state goes to the shared store so any worker can pick the interview up
+        if not owns_session(): return
+        async with checkpoint_lock:
+            try:
+                await session_store.save(sid, session_state(session))
+                await session["history"].checkpoint(session_store, sid)
+            except Exception as e:
+                print(f"Session checkpoint error: {e}")
 
-    # Check if we are resuming (questions exist per DB)
-    async with AsyncSessionLocal() as db:
-        q_count = await db.execute(select(Question).where(Question.interviewId == interview_id)) # This returns rows, count via len or func.count
-        # Better:
-        from sqlalchemy import func
-        result = await db.execute(select(func.count(Question.id)).where(Question.interviewId == interview_id))
-        questions_count = result.scalar()
-        is_resuming = questions_count > 0
-
-        if not is_resuming:
-            new_q = Question(interviewId=interview_id, question=FIRST_QUESTION)
-            db.add(new_q)
-            await db.commit()
-            SESSIONS[sid]["history"].append({"role": "assistant", "content": FIRST_QUESTION})
-        else:
-            # Load history context from DB if sophisticated (omitted for speed, assumes fresh session usually)
-            pass
-
-    async def run_tts_task(text, sid_local):
+    async def heartbeat():
+        # Keeps this connection's liveness mark fresh; once a newer connection
+        # (on any worker) has claimed the interview, this one stands down
+        while True:
+            await asyncio.sleep(SESSION_LIVE_TTL_SEC / 3)
+            try:
+                if not await session_store.refresh(sid, token):
+                    session["superseded"] = True
+                    session["task"].cancel()
+                    return
+            except Exception as e:
+                print(f"Session heartbeat error: {e}")
+
+    async def feedback_after_flush():
+        # Feedback reads the transcript from the DB, so let the writer catch up first
+        await writer.flush()
+        feedback_queue.enqueue(interview_id)
+
+    def cancel_playback(reason):
+        # Stops the reply being spoken; returns the audio_cancelled notice for the client, if any
+        playback = session["playback"]
+        session["playback"] = None
+        if playback is None or playback.done():
+            return None
+        played_ms = playback.cancel()
+        return {
+            "type": "audio_cancelled",
+            "utterance_id": playback.utterance_id,
+            "played_ms": played_ms,
+            "reason": reason,
+        }
+
+    async def run_tts(text, playback, pending=False, notice=None):
+        # text is either a full string or an asyncio.Queue of sentences fed by the LLM stream.
+        # Fixed lines go through the TTS cache; generated questions only through pending_audio.
         try:
-            await stream_inworld_tts_to_client(text, ws)
+            # The client stops the utterance this one replaces before any of this one's audio arrives
+            if notice:
+                try: await ws.send_json(notice)
+                except Exception: pass
+            if isinstance(text, asyncio.Queue):
+                pcm = await stream_sentences_to_client(text, playback, record=True)
+                # Keep the audio of the question now awaiting an answer, so a reconnect replays it instantly
+                if pcm and writer.current_question and not writer.completed:
+                    pending_audio.put(interview_id, writer.current_question, pcm)
+            elif pending:
+                await speak_pending(interview_id, text, playback)
+            else:
+                await speak_text(text, playback)
         except asyncio.CancelledError:
-            try:
-                await ws.send_json({"type": "audio_cancelled"})
-            except: pass
             return
         except Exception as e:
             print("TTS error:", e)
         finally:
-            if SESSIONS.get(sid_local):
-                SESSIONS[sid_local]["tts_task"] = None
+            if playback.trace is not None:
+                playback.trace.finish()
+
+    def play(text, trace=None, pending=False):
+        # One utterance at a time: whatever is still streaming (e.g. a reply when the hard stop hits) ends here
+        notice = cancel_playback("superseded")
+        playback = Playback(audio_out, trace)
+        playback.task = asyncio.create_task(run_tts(text, playback, pending, notice))
+        session["playback"] = playback
+        return playback
+
+    # Barge-in requests (reason strings) from STT and the local VAD
+    barge_in = asyncio.Queue()
+
+    def start_sentence_tts(trace=None):
+        sentences = asyncio.Queue()
+        play(sentences, trace)
+        return sentences
+
+    async def mark_written(trace):
+        await writer.flush()
+        trace.mark("db_written")
+
+    def take_speculation():
+        spec = session.get("speculation")
+        session["speculation"] = None
+        return spec
+
+    def speculate():
+        # Called on AssemblyAI end_of_turn: start the reply now and let the silence
+        # window decide whether it is used (process_ai) or thrown away (more speech).
+        spec = take_speculation()
+        if spec: spec.discard()
+        # Guesses don't get LLM slots that committed turns are waiting for
+        if not SPECULATIVE_LLM or session["processing_ai"] or capacity.llm.saturated(): return
+
+        user_text = " ".join(session["buffer"]).strip()
+        timeLeft = DURATION_SEC - (datetime.now(timezone.utc) - start_time_utc).total_seconds()
+        if not user_text or timeLeft <= 10: return
+
+        notes, _ = time_notes(timeLeft)
+        messages = session["history"].prompt(notes, user_text=user_text)
+        session["speculation"] = SpeculativeReply((user_text, tuple(notes)), messages)
 
     async def process_ai():
-        if SESSIONS[sid]["processing_ai"]: return
-        SESSIONS[sid]["processing_ai"] = True
+        if session["processing_ai"]: return
+        session["processing_ai"] = True
+        note_turn(sid)
 
         elapsed = (datetime.now(timezone.utc) - start_time_utc).total_seconds()
         timeLeft = DURATION_SEC - elapsed
         
         # User Answer Processing
-        user_text = " ".join(SESSIONS[sid]["buffer"]).strip()
-        SESSIONS[sid]["buffer"] = []
+        user_text = " ".join(session["buffer"]).strip()
+        session["buffer"] = []
+        trace = session["trace"]
+        session["trace"] = None
         
-        # Save User Answer to DB (Update last question)
+        # Save User Answer (Update last question; committed together with the next question)
         if user_text:
-            async with AsyncSessionLocal() as db:
-                result = await db.execute(
-                    select(Question)
-                    .where(Question.interviewId == interview_id)
-                    .order_by(desc(Question.createdAt))
-                    .limit(1)
-                )
-                last_q = result.scalars().first()
-                if last_q:
-                    last_q.userAnswer = user_text
-                    await db.commit()
-            
-            SESSIONS[sid]["history"].append({"role": "user", "content": user_text})
+            writer.set_answer(user_text)
+            pending_audio.drop(interview_id)
+            # Grade this answer in the background so final feedback is just an aggregation
+            schedule_scoring(interview_id, writer.current_question_id, writer.current_question, user_text, SCORING_CONTEXT, writer)
+            session["history"].add_user(user_text)
 
         # --- TERMINATION LOGIC ---
         is_final = False
         reply = ""
 
+        spec = take_speculation()
+        if not user_text and timeLeft > 10:
+            if spec: spec.discard()
+            session["processing_ai"] = False
+            return
+
+        session["ai_end_ts"] = time.time()
+        session["reading_time"] = MAX_READING_TIME
+        sentences = None
+
         if timeLeft <= 10: # < 10s: Hard stop
-             reply = "Our time is up. Thank you for your responses. I will now end the interview."
+             reply = CLOSING_REPLY
              is_final = True
+             if spec: spec.discard()
         else:
-            if not user_text and timeLeft > 0:
-                SESSIONS[sid]["processing_ai"] = False
-                return
-
+            # Time-based instructions (short question / conclude) apply to this reply only
+            notes, is_final = time_notes(timeLeft)
+
+            # Reuse the reply speculated at end_of_turn if it was built from this exact turn
+            if spec and spec.matches((user_text, tuple(notes))):
+                messages, usage = spec.messages, spec.usage
+                deltas = spec.stream()
+            else:
+                if spec: spec.discard()
+                messages, usage = session["history"].prompt(notes), {}
+                deltas = stream_llm(messages, usage=usage)
+
+            # Start speaking as soon as the first sentence exists: TTS consumes this
+            # queue while the LLM is still generating the rest of the reply.
+            chunker = SentenceChunker()
+            parts = []
             try:
-                # 20s < Time < 40s: FORCE short question
-                if 20 < timeLeft < 40:
-                     SESSIONS[sid]["history"].append({"role": "system", "content": "You have less than 40 seconds remaining. Ask exactly one very short, simple question that can be answered in 20 seconds. Do not conclude yet."})
-                
-                # < 15s (but > 10s check above): Conclusion
-                if timeLeft <= 15:
-                     SESSIONS[sid]["history"].append({"role": "system", "content": "Time is almost up. Conclude the interview now with a closing statement."})
-                     is_final = True
-
-                reply = ask_llm(SESSIONS[sid]["history"])
+                async for delta in deltas:
+                    if trace: trace.mark_once("llm_first_token")
+                    parts.append(delta)
+                    try: await ws.send_json({"type": "ai_partial", "text": delta})
+                    except: pass
+                    for sentence in chunker.feed(delta):
+                        if sentences is None:
+                            sentences = start_sentence_tts(trace)
+                        sentences.put_nowait(sentence)
             except Exception as e:
                 print("LLM Error:", e)
-                reply = "Could you repeat that?"
-
-        SESSIONS[sid]["history"].append({"role": "assistant", "content": reply})
+            if trace: trace.mark("llm_last_token")
+
+            reply = "".join(parts).strip()
+            turn = session["history"].record_usage(messages, usage)
+            metrics.observe("interview_llm_prompt_tokens", turn["prompt_tokens"] or turn["estimated_prompt_tokens"])
+            if not reply:
+                reply = REPEAT_REPLY
+            else:
+                if sentences is None:
+                    sentences = start_sentence_tts(trace)
+                rest = chunker.flush()
+                if rest:
+                    sentences.put_nowait(rest)
+                sentences.put_nowait(None)
+
+        # Fixed lines are spoken whole, from the TTS cache when possible
+        if sentences is None:
+            play(reply, trace)
+
+        session["history"].add_assistant(reply)
 
         # Save AI Question if NOT final (or even if final, to record the closing statement)
-        async with AsyncSessionLocal() as db:
-            db.add(Question(interviewId=interview_id, question=reply))
-            if is_final:
-                # Mark DB as completed NOW
-                # We need to fetch interview again to attach or just update by ID logic (but sqlalchemy needs obj or explicit update)
-                # Explicit update:
-                from sqlalchemy import update
-                await db.execute(
-                    update(Interview)
-                    .where(Interview.id == interview_id)
-                    .values(status="COMPLETED", endTime=datetime.now(timezone.utc))
-                )
-            await db.commit()
-
+        writer.add_question(reply)
+        if trace: asyncio.create_task(mark_written(trace))
         if is_final:
-             # Trigger feedback generation immediately
-             asyncio.create_task(generate_feedback(interview_id))
+             # Mark DB as completed in the same transaction, then trigger feedback
+             writer.complete()
+             asyncio.create_task(feedback_after_flush())
 
         rt = min(MAX_READING_TIME, max(MIN_READING_TIME, len(reply) * READING_MS_PER_CHAR))
-        SESSIONS[sid]["reading_time"] = rt + 1.0
-        SESSIONS[sid]["ai_end_ts"] = time.time()
+        session["reading_time"] = rt + 1.0
+        session["ai_end_ts"] = time.time()
 
         try:
             await ws.send_json({
                 "type": "ai_response", 
                 "text": reply, 
-                "reading_time": SESSIONS[sid]["reading_time"],
+                "reading_time": session["reading_time"],
                 "is_final": is_final,
                 "time_left": int(timeLeft)
             })
         except: pass
         
-        SESSIONS[sid]["processing_ai"] = False
+        session["processing_ai"] = False
+        await checkpoint()
 
-        # Play Audio
-        await asyncio.sleep(0.5)
-        t = asyncio.create_task(run_tts_task(reply, sid))
-        SESSIONS[sid]["tts_task"] = t
-
-    # If new session, greet
-    if not is_resuming:
-        try:
-            await ws.send_json({"type": "ai_response", "text": FIRST_QUESTION, "reading_time": 4})
-        except: pass
-        initial_t = asyncio.create_task(run_tts_task(FIRST_QUESTION, sid))
-        SESSIONS[sid]["tts_task"] = initial_t
-        SESSIONS[sid]["ai_end_ts"] = time.time()
-        SESSIONS[sid]["reading_time"] = 4
+    aai_connected = False
+    stt_slot = False
+    SESSIONS[sid] = session
+    # From here on the finally below cleans up, whatever fails
+    try:
+        await session_store.claim(sid, token)
+        heartbeat_task = asyncio.create_task(heartbeat())
 
+        # A checkpoint left by another worker (or a crashed one) restores the conversation as it was
+        saved = await session_store.load(sid)
+        if saved:
+            session["history"].restore(saved["summary"], saved["turns"])
+            session.update({k: v for k, v in saved["state"].items() if k in STATE_FIELDS})
 
-    # AssemblyAI Connection
-    params = f"?sample_rate={SAMPLE_RATE}"
-    headers = {"Authorization": ASSEMBLYAI_API_KEY or ""}
+        # Check if we are resuming: the whole transcript in one indexed, ordered query
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Question.id, Question.userAnswer, Question.question)
+                .where(Question.interviewId == interview_id)
+                .order_by(Question.createdAt)
+            )
+            rows = result.all()
+        is_resuming = bool(rows)
+        last_q = rows[-1] if rows else None
+
+        # All transcript writes for this session go through the writer (write-behind)
+        writer = TranscriptWriter(interview_id, *(last_q or ()))
 
-    try:
+        if not is_resuming:
+            writer.add_question(FIRST_QUESTION)
+            session["history"].add_assistant(FIRST_QUESTION)
+        elif not saved:
+            # No checkpoint (e.g. single worker restarted): rebuild the LLM context from the transcript
+            turns = []
+            for _, answer, question in rows:
+                turns.append({"role": "assistant", "content": question})
+                if answer:
+                    turns.append({"role": "user", "content": answer})
+            session["history"].restore("", turns, stored=False)
+
+        # If new session, greet
+        if not is_resuming:
+            try:
+                await ws.send_json({"type": "ai_response", "text": FIRST_QUESTION, "reading_time": 4})
+            except: pass
+            play(FIRST_QUESTION)
+            session["ai_end_ts"] = time.time()
+            session["reading_time"] = 4
+        elif not last_q.userAnswer and not session["buffer"]:
+            # Reconnected while a question was waiting for an answer: ask it again (audio is usually kept)
+            elapsed = (datetime.now(timezone.utc) - start_time_utc).total_seconds()
+            rt = min(MAX_READING_TIME, max(MIN_READING_TIME, len(last_q.question) * READING_MS_PER_CHAR))
+            try:
+                await ws.send_json({
+                    "type": "ai_response",
+                    "text": last_q.question,
+                    "reading_time": rt,
+                    "time_left": int(DURATION_SEC - elapsed),
+                    "resumed": True,
+                })
+            except: pass
+            play(last_q.question, pending=True)
+            session["ai_end_ts"] = time.time()
+            session["reading_time"] = rt
+        elif session["buffer"]:
+            # Words heard just before the drop: reply to them once the reconnect settles
+            timers.arm("silence", SILENCE_FINAL_SEC)
+        await checkpoint()
+
+        # AssemblyAI Connection
+        params = f"?sample_rate={SAMPLE_RATE}"
+        headers = {"Authorization": ASSEMBLYAI_API_KEY or ""}
+
+        await capacity.stt.acquire(sid)
+        stt_slot = True
         async with websockets.connect(ASSEMBLYAI_URL + params, extra_headers=headers) as aai_ws:
+            aai_connected = True
+            metrics.add("assemblyai_sockets")
             
             async def send_audio():
                 try:
                     while True:
                         data = await ws.receive_bytes()
+                        now = time.time()
                         # Gate sending: Only if AI finished "reading/speaking" time
-                        if time.time() - (SESSIONS[sid]["ai_end_ts"] or 0) > (SESSIONS[sid]["reading_time"] or 0):
-                            await aai_ws.send(data)
+                        if gate.closed(session["ai_end_ts"], session["reading_time"], now):
+                            speech = vad.update(data, now) if vad else False
+                            if not gate.hold(data, speech):
+                                continue
+                            # Candidate is talking over the reply: open the gate now. The held
+                            # tail already ends with this chunk.
+                            session["reading_time"] = 0
+                            barge_in.put_nowait("vad")
+                            for chunk in gate.release():
+                                await aai_ws.send(chunk)
+                            continue
+
+                        # The start of an early answer was held while gated; it goes first
+                        for chunk in gate.release():
+                            await aai_ws.send(chunk)
+
+                        # Silence while the candidate thinks stays local (keepalives only)
+                        out = vad.filter(data, now) if vad else data
+                        if out:
+                            await aai_ws.send(out)
+                        # Still talking, transcript not in yet: don't let the silence window close
+                        if vad and vad.speaking(now) and timers.armed("silence"):
+                            timers.arm("silence", SILENCE_FINAL_SEC)
                 except WebSocketDisconnect: pass
                 except Exception: pass
 
@@ -264,94 +494,142 @@ async def interview_ws(ws: WebSocket, interview_id: str):
                         if d.get("type") == "Turn":
                             text = d.get("transcript", "").strip()
                             if text:
-                                SESSIONS[sid]["last_voice_ts"] = time.time()
-                                ttask = SESSIONS[sid].get("tts_task")
-                                if ttask and not ttask.done():
-                                    ttask.cancel()
-                                    SESSIONS[sid]["tts_task"] = None
+                                session["last_voice_ts"] = time.time()
+                                trace = session["trace"] or TurnTrace()
+                                session["trace"] = trace
+                                trace.mark("stt_partial")
+                                timers.arm("silence", vad.silence_delay(SILENCE_FINAL_SEC) if vad else SILENCE_FINAL_SEC)
+                                barge_in.put_nowait("speech")
+
+                                # Candidate kept talking: the speculated reply is stale
+                                if not d.get("end_of_turn"):
+                                    spec = take_speculation()
+                                    if spec: spec.discard()
                                 
                                 try: await ws.send_json({"type": "stt_partial", "text": text})
                                 except: pass
                                 
                                 if d.get("end_of_turn"):
-                                    SESSIONS[sid]["buffer"].append(text)
+                                    trace.mark("end_of_turn")
+                                    session["buffer"].append(text)
+                                    asyncio.create_task(checkpoint())
                                     try: await ws.send_json({"type": "stt_final", "text": text})
                                     except: pass
+                                    speculate()
                     except: continue
 
+            async def watch_barge_in():
+                # Stops the reply being spoken as soon as the candidate talks over it
+                while True:
+                    notice = cancel_playback(await barge_in.get())
+                    if notice is None:
+                        continue
+                    try: await ws.send_json(notice)
+                    except: pass
+
             async def watch_silence_and_time():
+                # Force termination if time completely runs out (margin of 5s)
+                elapsed = (datetime.now(timezone.utc) - start_time_utc).total_seconds()
+                timers.arm("hard_stop", DURATION_SEC + 5 - elapsed)
+
+                # Sleeps until a deadline actually fires; recv_text pushes "silence" forward on every Turn
                 while True:
-                    await asyncio.sleep(0.5)
-                    
-                    # 1. Check Global Timeout
-                    now_utc = datetime.now(timezone.utc)
-                    elapsed_check = (now_utc - start_time_utc).total_seconds()
-                    
-                    # Force termination if time completely runs out (margin of 5s)
-                    if elapsed_check >= DURATION_SEC + 5:
+                    fired = await timers.next()
+
+                    # 1. Global Timeout
+                    if fired == "hard_stop":
                          # Force close properly
-                         async with AsyncSessionLocal() as db:
-                             from sqlalchemy import update
-                             await db.execute(
-                                 update(Interview)
-                                 .where(Interview.id == interview_id)
-                                 .values(status="COMPLETED", endTime=now_utc)
-                             )
-                             await db.commit()
-                         
-                         asyncio.create_task(generate_feedback(interview_id))
-                         try: await ws.send_json({"type": "ai_response", "text": "Time is up.", "is_final": True})
+                         writer.complete()
+                         asyncio.create_task(feedback_after_flush())
+                         try: await ws.send_json({"type": "ai_response", "text": TIME_UP_REPLY, "is_final": True})
                          except: pass
+                         play(TIME_UP_REPLY)
                          await asyncio.sleep(2)
                          await ws.close()
                          break
 
-                    # 2. Check Silence
-                    last = SESSIONS[sid].get("last_voice_ts")
-                    if last and (time.time() - last) > SILENCE_FINAL_SEC:
-                        SESSIONS[sid]["last_voice_ts"] = None
+                    # 2. Silence
+                    if fired == "silence":
+                        session["last_voice_ts"] = None
+                        if session["trace"]: session["trace"].mark("silence_fired")
                         await process_ai()
 
-            await asyncio.gather(send_audio(), recv_text(), watch_silence_and_time())
-
+            # The session ends with whichever side stops first (client gone, STT gone, time up)
+            tasks = [asyncio.create_task(c) for c in (send_audio(), recv_text(), watch_barge_in(), watch_silence_and_time())]
+            try:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for t in tasks:
+                    t.cancel()
+            for t in done:
+                t.result()
+
+    except asyncio.CancelledError:
+        # Superseded by a newer connection to this interview: end quietly
+        if not session["superseded"]:
+            raise
     except Exception as e:
         print(f"WS Exception: {e}")
     finally:
-        # 1. Flush Pending Buffer (Save user's last words if cut off)
-        try:
-            if sid in SESSIONS and SESSIONS[sid].get("buffer"):
-                final_text = " ".join(SESSIONS[sid]["buffer"]).strip()
-                if final_text:
-                    async with AsyncSessionLocal() as db:
-                        result = await db.execute(
-                            select(Question)
-                            .where(Question.interviewId == interview_id)
-                            .order_by(desc(Question.createdAt))
-                            .limit(1)
-                        )
-                        last_q = result.scalars().first()
-                        if last_q:
-                            new_ans = (last_q.userAnswer + " " + final_text) if last_q.userAnswer else final_text
-                            last_q.userAnswer = new_ans
-                            await db.commit()
-        except Exception as e:
-            print(f"Error flushing buffer: {e}")
-
-        # 2. Cleanup Session
-        if sid in SESSIONS: del SESSIONS[sid]
+        session["closing"] = True
+        if heartbeat_task:
+            heartbeat_task.cancel()
+
+        # 1. Cleanup this connection
+        if aai_connected:
+            metrics.add("assemblyai_sockets", -1)
+        if stt_slot:
+            capacity.stt.release()
+        admission.release()
+        timers.close()
+        spec = session["speculation"]
+        if spec: spec.discard()
+        playback = session["playback"]
+        if playback: playback.cancel()
+        session["history"].close()
+
+        # 2. The interview only ends on the final turn, the hard stop or /finish. A dropped
+        # socket (network blip, closed tab) leaves it IN_PROGRESS and resumable.
+        final = writer is not None and (writer.completed or session["finished"])
+        if final and session["buffer"]:
+            # Flush Pending Buffer (Save user's last words if cut off)
+            final_text = " ".join(session["buffer"]).strip()
+            session["buffer"] = []
+            writer.set_answer(final_text, append=True)
+            schedule_scoring(interview_id, writer.current_question_id, writer.current_question, writer.current_answer, SCORING_CONTEXT, writer)
+        if writer:
+            if final:
+                writer.complete()
+            try:
+                await writer.drain()
+            except Exception as e:
+                print(f"Error flushing transcript: {e}")
 
-        # 3. FAST TERMINATION: Mark as COMPLETED immediately if not already
+        # 3. Over: feedback (deduplicated by the queue). Dropped: keep the checkpoint
+        # for a reconnect and complete the interview if none comes within the grace period.
+        if final:
+            pending_audio.drop(interview_id)
+            feedback_queue.enqueue(interview_id)
         try:
-             async with AsyncSessionLocal() as db:
-                 from sqlalchemy import update
-                 await db.execute(
-                     update(Interview)
-                     .where(Interview.id == interview_id)
-                     .values(status="COMPLETED", endTime=datetime.now(timezone.utc))
-                 )
-                 await db.commit()
+            if final:
+                await session_store.delete(sid)
+            elif await session_store.owner(sid) in (None, token):
+                if writer:
+                    await checkpoint()
+                schedule_reap(interview_id)
+            await session_store.release(sid, token)
         except Exception as e:
-             pass
+            print(f"Session store cleanup error: {e}")
+        # The client closes the socket before sending /finish, so it can land during the
+        # awaits above: finish now instead of waiting out the grace period
+        if not final and session["finished"]:
+            cancel_reap(interview_id)
+            try:
+                await finalize_interview(interview_id)
+            except Exception as e:
+                print(f"Finishing {interview_id} failed: {e}")
 
-        # 4. Trigger Feedback Generation
-        asyncio.create_task(generate_feedback(interview_id))
+        # 4. A newer connection on this worker may already hold the entry; leave it alone
+        if owns_session():
+            del SESSIONS[sid]
+            forget_session(sid)
@@ -1,8 +1,25 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.database import engine, Base
 from app.api import ws, interview
+from app.services.llm import close_llm_client
+from app.services.tts_pool import tts_pool
+from app.services.tts import prewarm_tts_cache
+from app.services.transcript import drain_all_writers
+from app.services.feedback_queue import feedback_queue
+from app.services.session import SESSIONS, session_store
+from app.services.metrics import metrics
+from app.services.speculation import speculation_stats
+from app.services.tts_cache import tts_cache
+from app.services.vad import vad_stats
+from app.services.diagnostics import loop_monitor, LOOP_DIAGNOSTICS
+from app.services.capacity import capacity
+from app.services.notify import feedback_notifier
+from app.services.response_cache import interview_cache
+from app.services.reaper import cancel_all_reaps, sweep_abandoned
+import asyncio
 
 
 
@@ -13,8 +30,27 @@ async def lifespan(app: FastAPI):
     # We can leave this uncommented or commented depending on preference.
     # async with engine.begin() as conn:
     #     await conn.run_sync(Base.metadata.create_all)
+    if LOOP_DIAGNOSTICS:
+        loop_monitor.start()
+    await tts_pool.start()
+    await feedback_notifier.start()
+    await feedback_queue.start()
+    # Fill the TTS cache in the background; first interviews fall back to live synthesis
+    prewarm = asyncio.create_task(prewarm_tts_cache())
+    # Interviews dropped before the last shutdown lost their reap timers
+    sweep = asyncio.create_task(sweep_abandoned())
     yield
+    prewarm.cancel()
+    sweep.cancel()
+    cancel_all_reaps()
+    await drain_all_writers()
+    await feedback_queue.stop()
+    await feedback_notifier.close()
+    await tts_pool.close()
+    await session_store.close()
+    await close_llm_client()
     await engine.dispose()
+    await loop_monitor.stop()
 
 app = FastAPI(title="Interview AI Backend", lifespan=lifespan)
 
@@ -24,6 +60,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 app.include_router(ws.router)
@@ -32,3 +69,38 @@ app.include_router(interview.router, prefix="/api/interview", tags=["interview"]
 @app.get("/")
 def root():
     return {"message": "Interview AI Backend Running"}
+
+def _stat_gauges(prefix: str, stats: dict):
+    return {
+        f"{prefix}_{key}": (f"{prefix.replace('_', ' ')}: {key}", value)
+        for key, value in stats.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+
+@app.get("/metrics")
+def metrics_endpoint():
+    pool = tts_pool.stats()
+    feedback = feedback_queue.stats()
+    gauges = {
+        "interview_live_sessions": ("Interviews with an open websocket on this worker.", len(SESSIONS)),
+        "interview_assemblyai_sockets": ("Open AssemblyAI streaming sockets.", metrics.levels.get("assemblyai_sockets", 0)),
+        "interview_inworld_sockets": ("Open pooled Inworld TTS sockets.", pool["connections"]),
+        "interview_inworld_contexts": ("Inworld contexts in use.", pool["contexts"]),
+        "interview_feedback_queued": ("Feedback jobs waiting or running.", feedback["pending"]),
+        **_stat_gauges("interview_feedback", feedback),
+        **_stat_gauges("interview_speculation", speculation_stats.stats()),
+        **_stat_gauges("interview_tts_cache", tts_cache.stats()),
+        **_stat_gauges("interview_vad", vad_stats.stats()),
+        **_stat_gauges("interview_loop", loop_monitor.stats()),
+        **_stat_gauges("interview_capacity", capacity.stats()),
+        **_stat_gauges("interview_feedback_notify", feedback_notifier.stats()),
+        **_stat_gauges("interview_response_cache", interview_cache.stats()),
+    }
+    return PlainTextResponse(metrics.render(gauges), media_type="text/plain; version=0.0.4")
+
+if LOOP_DIAGNOSTICS:
+    # Stall stacks expose interview ids and code paths, so the route only exists when opted in
+    @app.get("/debug/loop")
+    def loop_debug():
+        # Recent event-loop stalls with the stack and interview that held the loop
+        return loop_monitor.report()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Float, Text
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Float, Text, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -21,6 +21,7 @@ class User(Base):
     accounts = relationship("Account", back_populates="user", cascade="all, delete-orphan")
     sessions = relationship("Session", back_populates="user", cascade="all, delete-orphan")
     interviews = relationship("Interview", back_populates="user")
+    stats = relationship("UserStats", back_populates="user", cascade="all, delete-orphan")
 
 class Account(Base):
     __tablename__ = "Account"
@@ -79,6 +80,9 @@ class Interview(Base):
     questions = relationship("Question", back_populates="interview", cascade="all, delete-orphan")
     feedback = relationship("Feedback", uselist=False, back_populates="interview", cascade="all, delete-orphan")
 
+    # Dashboard listing pages through a user's interviews newest first (keyset on createdAt, id)
+    __table_args__ = (Index("Interview_userId_createdAt_id_idx", "userId", "createdAt", "id"),)
+
 class Question(Base):
     __tablename__ = "Question"
     
@@ -88,8 +92,17 @@ class Question(Base):
     userAnswer = Column(String, nullable=True)
     createdAt = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Per-answer scores filled in during the interview (1-10)
+    technicalScore = Column(Integer, nullable=True)
+    communicationScore = Column(Integer, nullable=True)
+    englishScore = Column(Integer, nullable=True)
+    evaluation = Column(String, nullable=True)
+
     interview = relationship("Interview", back_populates="questions")
 
+    # Transcript reads (resume, feedback) fetch one interview's questions in order
+    __table_args__ = (Index("Question_interviewId_createdAt_idx", "interviewId", "createdAt"),)
+
 class Feedback(Base):
     __tablename__ = "Feedback"
     
@@ -103,3 +116,28 @@ class Feedback(Base):
     createdAt = Column(DateTime(timezone=True), server_default=func.now())
 
     interview = relationship("Interview", back_populates="feedback")
+
+class UserStats(Base):
+    __tablename__ = "UserStats"
+
+    # Running totals per user, updated in the same transaction that writes each Feedback row.
+    # topic = difficulty = "" is the user's overall row; the others are per (topic, difficulty).
+    id = Column(String, primary_key=True, default=generate_cuid)
+    userId = Column(String, ForeignKey("User.id", ondelete="CASCADE"), nullable=False)
+    topic = Column(String, nullable=False, default="")
+    difficulty = Column(String, nullable=False, default="")
+    interviews = Column(Integer, nullable=False, default=0)
+    ratingSum = Column(Integer, nullable=False, default=0)
+    technicalSum = Column(Integer, nullable=False, default=0)
+    technicalCount = Column(Integer, nullable=False, default=0)
+    englishSum = Column(Integer, nullable=False, default=0)
+    englishCount = Column(Integer, nullable=False, default=0)
+    communicationSum = Column(Integer, nullable=False, default=0)
+    communicationCount = Column(Integer, nullable=False, default=0)
+    recentRatings = Column(String, nullable=False, default="[]")  # JSON list, newest last
+    lastFeedbackAt = Column(DateTime(timezone=True), nullable=True)
+    updatedAt = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
+
+    user = relationship("User", back_populates="stats")
+
+    __table_args__ = (UniqueConstraint("userId", "topic", "difficulty", name="UserStats_userId_topic_difficulty_key"),)
@@ -16,6 +16,10 @@ class QuestionRead(BaseModel):
     id: str
     question: str
     userAnswer: Optional[str] = None
+    technicalScore: Optional[int] = None
+    communicationScore: Optional[int] = None
+    englishScore: Optional[int] = None
+    evaluation: Optional[str] = None
     createdAt: datetime
     model_config = ConfigDict(from_attributes=True)
 
@@ -43,6 +47,45 @@ class InterviewRead(BaseModel):
     feedback: Optional[FeedbackRead] = None
     model_config = ConfigDict(from_attributes=True)
 
+class FeedbackScores(BaseModel):
+    id: str
+    rating: int
+    englishScore: Optional[int] = None
+    technicalScore: Optional[int] = None
+    communicationScore: Optional[int] = None
+    model_config = ConfigDict(from_attributes=True)
+
+class InterviewListItem(BaseModel):
+    """Dashboard row: status and scores only, no feedback text."""
+    id: str
+    topic: str
+    duration: int
+    difficulty: str
+    seniority: Optional[str] = None
+    concept: Optional[str] = None
+    status: str
+    startTime: Optional[datetime] = None
+    endTime: Optional[datetime] = None
+    createdAt: datetime
+    feedback: Optional[FeedbackScores] = None
+
+class ScoreRollup(BaseModel):
+    topic: Optional[str] = None
+    difficulty: Optional[str] = None
+    interviews: int
+    avgRating: Optional[float] = None
+    avgTechnical: Optional[float] = None
+    avgEnglish: Optional[float] = None
+    avgCommunication: Optional[float] = None
+    recentRatings: List[int] = []
+    trend: Optional[float] = None
+    lastFeedbackAt: Optional[datetime] = None
+
+class UserStatsRead(BaseModel):
+    userId: str
+    overall: Optional[ScoreRollup] = None
+    byTopic: List[ScoreRollup] = []
+
 class InterviewFullRead(InterviewRead):
     questions: List[QuestionRead] = []
     user: Optional[UserRead] = None
@@ -0,0 +1,83 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# What happens to microphone audio while the AI reply is being read:
+#   "buffer" - keep it in a ring buffer, replay the tail when the gate opens or the candidate barges in
+#   "drop"   - discard it (previous behaviour)
+#   "open"   - no gate, everything goes to STT
+AUDIO_GATE_POLICY = os.getenv("AUDIO_GATE_POLICY", "buffer")
+AUDIO_RING_MS = int(os.getenv("AUDIO_RING_MS", "2000"))
+AUDIO_PREROLL_MS = int(os.getenv("AUDIO_PREROLL_MS", "300"))
+AUDIO_BARGE_IN_MS = int(os.getenv("AUDIO_BARGE_IN_MS", "300"))
+
+class AudioRingBuffer:
+    """Fixed-size ring of recent PCM; memory is allocated once per session."""
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.buf = bytearray(capacity)
+        self.view = memoryview(self.buf)
+        self.end = 0  # total bytes ever written
+
+    def __len__(self):
+        return min(self.end, self.capacity)
+
+    def write(self, data):
+        data = memoryview(data)[-self.capacity:]
+        start = self.end % self.capacity
+        first = min(len(data), self.capacity - start)
+        self.view[start:start + first] = data[:first]
+        self.view[:len(data) - first] = data[first:]
+        self.end += len(data)
+
+    def tail(self, nbytes: int):
+        """The last nbytes as at most two memoryview slices (no copy)."""
+        nbytes = min(nbytes, len(self))
+        start = (self.end - nbytes) % self.capacity
+        if start + nbytes <= self.capacity:
+            return [self.view[start:start + nbytes]] if nbytes else []
+        return [self.view[start:], self.view[:nbytes - (self.capacity - start)]]
+
+    def clear(self):
+        self.end = 0
+
+class AudioGate:
+    """
+    Reading-time gate for one session. Audio that arrives while the gate is
+    closed is held (policy "buffer"); sustained speech over it counts as a
+    barge-in, and reopening the gate releases the last AUDIO_PREROLL_MS.
+    """
+    def __init__(self, sample_rate: int = 16000, policy: str = AUDIO_GATE_POLICY):
+        self.policy = policy
+        self.bytes_per_ms = sample_rate * 2 // 1000
+        self.ring = AudioRingBuffer(AUDIO_RING_MS * self.bytes_per_ms) if policy == "buffer" else None
+        self.holding = False
+        self.speech_ms = 0.0
+
+    def closed(self, ai_end_ts, reading_time, now: float):
+        return self.policy != "open" and now - (ai_end_ts or 0) <= (reading_time or 0)
+
+    def hold(self, pcm: bytes, speech: bool):
+        """Keeps a gated chunk; returns True once the candidate has talked over the gate long enough."""
+        self.holding = True
+        if self.ring is None:
+            return False
+        self.ring.write(pcm)
+        self.speech_ms = self.speech_ms + len(pcm) / self.bytes_per_ms if speech else 0.0
+        return self.speech_ms >= AUDIO_BARGE_IN_MS
+
+    def release(self):
+        """
+        Gate reopened: returns the held tail to send ahead of live audio. The
+        slices stay valid until the next hold(); send them before that.
+        """
+        if not self.holding:
+            return []
+        self.holding = False
+        self.speech_ms = 0.0
+        if self.ring is None:
+            return []
+        chunks = self.ring.tail(AUDIO_PREROLL_MS * self.bytes_per_ms)
+        self.ring.clear()
+        return chunks
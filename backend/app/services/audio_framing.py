@@ -0,0 +1,83 @@
+import io
+import wave
+import struct
+import numpy as np
+
+# Client-selectable framing for TTS audio (?audio_format=... on /ws/interview):
+#   "wav"   - every chunk is a standalone WAV file (original protocol, default)
+#   "pcm16" - raw little-endian 16-bit PCM behind a 4-byte header
+#   "mulaw" - G.711 mu-law (8-bit) behind the same header, half the bytes of pcm16
+AUDIO_FORMATS = ("wav", "pcm16", "mulaw")
+
+# uint16 utterance id + uint16 sequence number; 4 bytes keeps the PCM 16-bit aligned
+FRAME_HEADER = struct.Struct("<HH")
+
+def pcm_to_wav(pcm: bytes, rate: int):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(pcm)
+    return buf.getvalue()
+
+def wav_to_pcm(audio: bytes):
+    with wave.open(io.BytesIO(audio), "rb") as wf:
+        return wf.readframes(wf.getnframes())
+
+def _mulaw_table():
+    # G.711 (Sun reference coder) for every possible int16 once; a chunk is then a single lookup
+    x = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32) >> 2
+    mask = np.where(x < 0, 0x7F, 0xFF)
+    x = np.minimum(np.abs(x), 8159) + 33
+    seg = np.searchsorted(np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF]), x)
+    code = np.where(seg >= 8, 0x7F, (seg << 4) | ((x >> (seg + 1)) & 0x0F))
+    return (code ^ mask).astype(np.uint8)
+
+MULAW_TABLE = _mulaw_table()
+
+def pcm_to_mulaw(pcm: bytes):
+    samples = np.frombuffer(pcm, dtype=np.uint16, count=len(pcm) // 2)
+    return MULAW_TABLE[samples].tobytes()
+
+class AudioOutput:
+    """
+    TTS audio going to one client websocket. Each utterance starts with an
+    audio_meta message; in the binary formats every frame then carries the
+    utterance id and a sequence number so the client can drop stale audio.
+    The id and sequence belong to the caller (a Playback), so two utterances
+    in flight at once never share a counter.
+    """
+    def __init__(self, ws, audio_format: str = "wav", sample_rate: int = 24000):
+        self.ws = ws
+        self.format = audio_format if audio_format in AUDIO_FORMATS else "wav"
+        self.sample_rate = sample_rate
+        self.last_utterance = 0
+
+    def next_utterance(self):
+        self.last_utterance = (self.last_utterance + 1) & 0xFFFF
+        return self.last_utterance
+
+    def meta(self, utterance_id: int):
+        if self.format == "wav":
+            return {"type": "audio_meta", "mime": "audio/wav"}
+        return {
+            "type": "audio_meta",
+            "format": self.format,
+            "sample_rate": self.sample_rate,
+            "channels": 1,
+            "utterance_id": utterance_id,
+        }
+
+    async def send(self, pcm: bytes, utterance_id: int, seq: int):
+        # Frame 0 of an utterance is preceded by its audio_meta
+        if seq == 0:
+            await self.ws.send_json(self.meta(utterance_id))
+        if self.format == "wav":
+            await self.ws.send_bytes(pcm_to_wav(pcm, self.sample_rate))
+            return
+        payload = pcm_to_mulaw(pcm) if self.format == "mulaw" else pcm
+        await self.ws.send_bytes(FRAME_HEADER.pack(utterance_id, seq & 0xFFFF) + payload)
+
+    async def send_json(self, data: dict):
+        await self.ws.send_json(data)
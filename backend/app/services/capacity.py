@@ -0,0 +1,215 @@
+import os
+import time
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+
+from app.services.tts_pool import TTS_POOL_SIZE, TTS_CONTEXTS_PER_CONN
+
+load_dotenv()
+
+# An interview holds an Inworld context only while the AI is speaking, well under
+# half of its time, so each pooled context can carry about two live interviews
+TTS_INTERVIEWS_PER_CONTEXT = 2
+# Admission: live interviews per worker (sized to the TTS pool by default), and how many new ones may wait for a slot
+MAX_LIVE_INTERVIEWS = int(os.getenv(
+    "MAX_LIVE_INTERVIEWS", str(TTS_POOL_SIZE * TTS_CONTEXTS_PER_CONN * TTS_INTERVIEWS_PER_CONTEXT)
+))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "50"))
+ADMISSION_MAX_WAIT_SEC = float(os.getenv("ADMISSION_MAX_WAIT_SEC", "60"))
+ADMISSION_UPDATE_SEC = 5.0
+# Per-upstream limits (0 = unlimited). Inworld contexts are bounded by the pool itself (TTS_POOL_SIZE x TTS_CONTEXTS_PER_CONN).
+STT_MAX_STREAMS = int(os.getenv("STT_MAX_STREAMS", str(MAX_LIVE_INTERVIEWS)))
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "64"))
+
+# Close code for "try again later" (RFC 6455)
+TRY_AGAIN_LATER = 1013
+
+# Waiters with a lower priority number are served first
+RESUMING = INTERACTIVE = 0
+NEW = BACKGROUND = 1
+
+class FairLimiter:
+    """
+    Concurrency limit with a fair queue: waiters are served by priority, then
+    round-robin across keys (interview ids), so one chatty session can't starve
+    the others.
+    """
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.active = 0
+        self.lanes = {}  # priority -> OrderedDict(key -> deque of futures)
+        self.granted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    def waiting(self, priority: int = None):
+        return sum(
+            len(q)
+            for p, lanes in self.lanes.items() if priority is None or p <= priority
+            for q in lanes.values()
+        )
+
+    def saturated(self):
+        return self.limit > 0 and self.active >= self.limit
+
+    async def acquire(self, key=None, priority: int = INTERACTIVE):
+        if self.limit <= 0 or (self.active < self.limit and not self.waiting()):
+            self.active += 1
+            self.granted += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self.lanes.setdefault(priority, OrderedDict()).setdefault(key, deque()).append(fut)
+        self.queued += 1
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Granted just as we were cancelled: pass the slot on
+                self.release()
+            else:
+                self._discard(priority, key, fut)
+            raise
+        self.granted += 1
+
+    def release(self):
+        # Unlimited limiters count active too (acquire always does); nobody ever waits on them
+        self.active -= 1
+        while self.active < self.limit:
+            fut = self._next()
+            if fut is None:
+                break
+            self.active += 1
+            fut.set_result(None)
+
+    def _next(self):
+        for priority in sorted(self.lanes):
+            lanes = self.lanes[priority]
+            while lanes:
+                key, q = lanes.popitem(last=False)
+                fut = q.popleft()
+                if q:
+                    lanes[key] = q  # back of the line for this key's next request
+                if not fut.done():
+                    return fut
+            del self.lanes[priority]
+        return None
+
+    def _discard(self, priority, key, fut):
+        lanes = self.lanes.get(priority, {})
+        q = lanes.get(key)
+        if q and fut in q:
+            q.remove(fut)
+            if not q:
+                del lanes[key]
+
+    @asynccontextmanager
+    async def slot(self, key=None, priority: int = INTERACTIVE):
+        await self.acquire(key, priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self):
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting(),
+            "granted": self.granted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+        }
+
+class CapacityManager:
+    """Per-worker limits for live interviews and each paid upstream."""
+    def __init__(self):
+        self.interviews = FairLimiter("interviews", MAX_LIVE_INTERVIEWS)
+        self.stt = FairLimiter("stt", STT_MAX_STREAMS)
+        self.llm = FairLimiter("llm", LLM_MAX_IN_FLIGHT)
+        # Moving average of how long an interview holds its slot; seeds the wait estimate
+        self.avg_session_sec = 15 * 60.0
+
+    def session_ended(self, seconds: float):
+        self.avg_session_sec = 0.9 * self.avg_session_sec + 0.1 * seconds
+
+    def estimated_wait(self, position: int):
+        # Slots free up at roughly limit / avg_session_sec per second
+        limit = max(1, self.interviews.limit)
+        return int(position * self.avg_session_sec / limit) + 1
+
+    def stats(self):
+        return {
+            "estimated_wait_sec": self.estimated_wait(self.interviews.waiting() + 1) if self.interviews.saturated() else 0,
+            **{f"{l.name}_{k}": v for l in (self.interviews, self.stt, self.llm) for k, v in l.stats().items()},
+        }
+
+capacity = CapacityManager()
+
+class Admission:
+    """A held live-interview slot. release() may be called more than once."""
+    def __init__(self):
+        self.started = time.monotonic()
+        self.released = False
+
+    def release(self):
+        if self.released:
+            return
+        self.released = True
+        capacity.session_ended(time.monotonic() - self.started)
+        capacity.interviews.release()
+
+async def _reject(ws, wait: int):
+    capacity.interviews.rejected += 1
+    try:
+        await ws.send_json({"type": "capacity", "status": "rejected", "retry_after_sec": wait})
+        await ws.close(code=TRY_AGAIN_LATER, reason=f"Server at capacity, retry in ~{wait}s")
+    except Exception:
+        pass
+
+async def _abandon(limiter: FairLimiter, waiter):
+    if waiter.done() and not waiter.cancelled():
+        limiter.release()
+        return
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+
+async def admit_interview(ws, interview_id: str, resuming: bool):
+    """
+    Waits for a live-interview slot. Interviews already under way (reconnects)
+    jump ahead of new ones and are never turned away for a full queue. Returns
+    an Admission, or None after closing the socket with 1013 when the worker is full.
+    """
+    limiter = capacity.interviews
+    priority = RESUMING if resuming else NEW
+    if not limiter.saturated() and not limiter.waiting():
+        await limiter.acquire(interview_id, priority)
+        return Admission()
+
+    position = limiter.waiting(priority) + 1
+    wait = capacity.estimated_wait(position)
+    if not resuming and (limiter.waiting() >= ADMISSION_QUEUE_SIZE or wait > ADMISSION_MAX_WAIT_SEC):
+        await _reject(ws, wait)
+        return None
+
+    waiter = asyncio.ensure_future(limiter.acquire(interview_id, priority))
+    deadline = time.monotonic() + ADMISSION_MAX_WAIT_SEC
+    while True:
+        try:
+            await ws.send_json({"type": "capacity", "status": "queued", "position": position, "estimated_wait_sec": wait})
+        except Exception:
+            # Candidate gave up while queued
+            await _abandon(limiter, waiter)
+            return None
+        timeout = ADMISSION_UPDATE_SEC if resuming else min(ADMISSION_UPDATE_SEC, max(0.0, deadline - time.monotonic()))
+        done, _ = await asyncio.wait({waiter}, timeout=timeout)
+        if done:
+            return Admission()
+        if not resuming and time.monotonic() >= deadline:
+            await _abandon(limiter, waiter)
+            await _reject(ws, capacity.estimated_wait(limiter.waiting(priority) + 1))
+            return None
+        position = limiter.waiting(priority)
+        wait = capacity.estimated_wait(position)
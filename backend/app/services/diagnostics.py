@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+import traceback
+from collections import deque
+from dotenv import load_dotenv
+
+from app.services.metrics import metrics
+from app.services.session import current_session
+
+load_dotenv()
+
+# Opt-in: a heartbeat task plus a watchdog thread that dumps the loop's stack when it stalls
+LOOP_DIAGNOSTICS = os.getenv("LOOP_DIAGNOSTICS", "0") == "1"
+LOOP_LAG_INTERVAL_SEC = float(os.getenv("LOOP_LAG_INTERVAL_SEC", "0.05"))
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
+LOOP_BLOCK_HISTORY = 50
+STACK_DEPTH = 12
+
+metrics.summary("interview_loop_lag_seconds", "Event-loop lag measured by the diagnostics heartbeat.")
+
+session_turns = {}
+
+def tag_session(session_id: str):
+    """Attributes the current task, and every task it creates from now on, to an interview."""
+    current_session.set(session_id)
+    session_turns.setdefault(session_id, 0)
+
+def note_turn(session_id: str):
+    session_turns[session_id] = session_turns.get(session_id, 0) + 1
+
+def forget_session(session_id: str):
+    session_turns.pop(session_id, None)
+
+def _task_factory(loop, coro, **kwargs):
+    task = asyncio.Task(coro, loop=loop, **kwargs)
+    # The factory runs in the creator's context, so the session tag is still visible here
+    session_id = current_session.get()
+    if session_id is not None and "name" not in kwargs:
+        task.set_name(f"interview:{session_id}:{getattr(coro, '__qualname__', 'task')}")
+    return task
+
+class LoopMonitor:
+    """
+    Measures event-loop lag continuously. When the loop has not come back for
+    LOOP_BLOCK_THRESHOLD_MS, a watchdog thread records the loop thread's stack
+    and the running task (named after its interview, see tag_session).
+    """
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL_SEC, threshold_ms: float = LOOP_BLOCK_THRESHOLD_MS):
+        self.interval = interval
+        self.threshold = threshold_ms / 1000
+        self.loop = None
+        self.loop_thread_id = None
+        self.beat = None
+        self.heartbeat = None
+        self.watchdog = None
+        self.stopping = threading.Event()
+        self.pending = None
+        self.blocks = deque(maxlen=LOOP_BLOCK_HISTORY)
+        self.block_count = 0
+        self.max_lag = 0.0
+
+    @property
+    def enabled(self):
+        return self.heartbeat is not None
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.loop.set_task_factory(_task_factory)
+        self.beat = time.perf_counter()
+        self.heartbeat = asyncio.create_task(self._heartbeat(), name="loop-diagnostics")
+        self.watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self.watchdog.start()
+
+    async def stop(self):
+        if not self.enabled:
+            return
+        self.stopping.set()
+        self.heartbeat.cancel()
+        await asyncio.gather(self.heartbeat, return_exceptions=True)
+        self.heartbeat = None
+        self.loop.set_task_factory(None)
+
+    async def _heartbeat(self):
+        while True:
+            start = self.beat = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - start - self.interval)
+            metrics.observe("interview_loop_lag_seconds", lag)
+            self.max_lag = max(self.max_lag, lag)
+            block = self.pending
+            if block is not None:
+                # The loop is back: now we know how long it was held
+                block["duration_ms"] = round(lag * 1000, 1)
+                self.blocks.append(block)
+                self.pending = None
+
+    def _watch(self):
+        while not self.stopping.wait(self.threshold / 2):
+            stalled = time.perf_counter() - self.beat - self.interval
+            if stalled < self.threshold or self.pending is not None:
+                continue
+            frame = sys._current_frames().get(self.loop_thread_id)
+            task = asyncio.current_task(self.loop)
+            name = task.get_name() if task else "(loop callback)"
+            session_id = name.split(":")[1] if name.startswith("interview:") else None
+            self.block_count += 1
+            self.pending = {
+                "at": time.time(),
+                "task": name,
+                "session": session_id,
+                "turn": session_turns.get(session_id),
+                "duration_ms": None,  # filled in when the loop resumes
+                "stack": traceback.format_stack(frame)[-STACK_DEPTH:] if frame else [],
+            }
+
+    def stats(self):
+        return {"enabled": int(self.enabled), "blocks": self.block_count, "max_lag_sec": round(self.max_lag, 4)}
+
+    def report(self):
+        return {
+            **self.stats(),
+            "threshold_ms": self.threshold * 1000,
+            "in_progress": self.pending,
+            "recent_blocks": list(self.blocks)[::-1],
+        }
+
+loop_monitor = LoopMonitor()
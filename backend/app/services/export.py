@@ -0,0 +1,123 @@
+"""
+Bulk export of interviews as NDJSON: one line per interview with its feedback
+and questions nested. Interview and question rows come from a server-side
+cursor; feedback is looked up once per batch of interviews, so memory stays
+flat however many interviews match.
+
+    cd backend
+    python -m app.services.export --status COMPLETED --since 2026-01-01 -o interviews.ndjson
+"""
+import os
+import sys
+import hmac
+import json
+import asyncio
+import argparse
+from datetime import datetime
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models import Interview, Question, Feedback
+
+load_dotenv()
+
+EXPORT_BATCH_ROWS = 500
+EXPORT_FEEDBACK_BATCH = 100  # interviews per feedback lookup
+# GET /api/interview/export needs "Authorization: Bearer <token>"; unset keeps export CLI-only
+EXPORT_ADMIN_TOKEN = os.getenv("EXPORT_ADMIN_TOKEN", "")
+
+INTERVIEW_FIELDS = ("id", "userId", "topic", "duration", "difficulty", "seniority", "concept",
+                    "status", "startTime", "endTime", "createdAt")
+FEEDBACK_FIELDS = ("rating", "englishScore", "technicalScore", "communicationScore", "feedbackText")
+QUESTION_FIELDS = ("id", "question", "userAnswer", "technicalScore", "communicationScore",
+                   "englishScore", "evaluation", "createdAt")
+
+def export_authorized(authorization: str):
+    """True for "Bearer <EXPORT_ADMIN_TOKEN>"; always False while no token is configured."""
+    if not EXPORT_ADMIN_TOKEN or not authorization:
+        return False
+    scheme, _, token = authorization.partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(token.strip(), EXPORT_ADMIN_TOKEN)
+
+def export_query(user_id: str = None, since: datetime = None, until: datetime = None, status: str = None):
+    """Interview x Question, ordered so each interview's rows are contiguous. Feedback is fetched separately."""
+    query = (
+        select(
+            *(getattr(Interview, f) for f in INTERVIEW_FIELDS),
+            *(getattr(Question, f).label(f"question_{f}") for f in QUESTION_FIELDS),
+        )
+        .outerjoin(Question, Question.interviewId == Interview.id)
+        .order_by(Interview.createdAt, Interview.id, Question.createdAt)
+    )
+    if user_id:
+        query = query.where(Interview.userId == user_id)
+    if since:
+        query = query.where(Interview.createdAt >= since)
+    if until:
+        query = query.where(Interview.createdAt < until)
+    if status:
+        query = query.where(Interview.status == status)
+    return query
+
+def _record(row):
+    r = row._mapping
+    record = {f: r[f] for f in INTERVIEW_FIELDS}
+    record["feedback"] = None
+    record["questions"] = []
+    return record
+
+async def _with_feedback(db, records):
+    # One lookup for the whole batch instead of repeating feedbackText on every question row
+    result = await db.execute(
+        select(Feedback.interviewId, *(getattr(Feedback, f) for f in FEEDBACK_FIELDS))
+        .where(Feedback.interviewId.in_([r["id"] for r in records]))
+    )
+    feedback = {row.interviewId: {f: row._mapping[f] for f in FEEDBACK_FIELDS} for row in result}
+    for record in records:
+        record["feedback"] = feedback.get(record["id"])
+    return records
+
+def _line(record):
+    return json.dumps(record, default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v)) + "\n"
+
+async def export_interviews(**filters):
+    """Yields NDJSON lines; at most EXPORT_FEEDBACK_BATCH interviews are held in memory."""
+    # Feedback lookups get their own session so they never share a connection with the open cursor
+    async with AsyncSessionLocal() as db, AsyncSessionLocal() as lookup:
+        result = await db.stream(export_query(**filters).execution_options(yield_per=EXPORT_BATCH_ROWS))
+        batch = []
+        async for row in result:
+            if not batch or batch[-1]["id"] != row.id:
+                if len(batch) >= EXPORT_FEEDBACK_BATCH:
+                    for record in await _with_feedback(lookup, batch):
+                        yield _line(record)
+                    batch = []
+                batch.append(_record(row))
+            if row.question_id is not None:
+                batch[-1]["questions"].append({f: row._mapping[f"question_{f}"] for f in QUESTION_FIELDS})
+        if batch:
+            for record in await _with_feedback(lookup, batch):
+                yield _line(record)
+
+async def main(args):
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    count = 0
+    try:
+        async for line in export_interviews(user_id=args.user, since=args.since, until=args.until, status=args.status):
+            out.write(line)
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        await engine.dispose()
+    print(f"Exported {count} interview(s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export interviews, questions and feedback as NDJSON.")
+    parser.add_argument("--user", help="only this userId")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="created at or after (ISO date/time)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="created before (ISO date/time)")
+    parser.add_argument("--status", help="e.g. COMPLETED")
+    parser.add_argument("-o", "--output", help="file to write (default: stdout)")
+    asyncio.run(main(parser.parse_args()))
@@ -1,107 +1,199 @@
-from app.services.llm import client
+from app.services.llm import client, llm_slot, LLM_MODEL
+from app.services.capacity import BACKGROUND
+from app.services.scoring import wait_for_scoring, INCREMENTAL_SCORING, SCORING_MODEL
+from app.services.notify import feedback_notifier
+from app.services.stats import record_feedback
 from app.core.database import AsyncSessionLocal
 from app.models import Interview, Feedback
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timezone
 import json
+import asyncio
+
+FEEDBACK_TIMEOUT_SEC = 60
+
+SUMMARY_PROMPT = """
+You are an expert technical interviewer. Every answer in this interview has already been graded;
+you get the questions with their per-answer scores and notes.
+Return ONLY a JSON object with one key:
+- feedbackText: A concise summary of strengths, weaknesses, and areas for improvement.
+"""
+
+def _avg(values):
+    values = [v for v in values if v is not None]
+    return sum(values) / len(values) if values else 0
+
+async def summarize_scored(interview, answered, unanswered: int):
+    """Final feedback from the per-answer scores: averages plus one short summary call."""
+    technical = _avg([q.technicalScore for q in answered])
+    communication = _avg([q.communicationScore for q in answered])
+    english = _avg([q.englishScore for q in answered])
+
+    lines = [f"Interview: {interview.seniority or 'Mid-Level'} {interview.topic} ({interview.difficulty})"]
+    for q in answered:
+        lines.append(
+            f"- Q: {q.question}\n  Scores: technical {q.technicalScore}, communication {q.communicationScore}, "
+            f"english {q.englishScore}\n  Note: {q.evaluation or '-'}"
+        )
+    if unanswered:
+        lines.append(f"Questions left unanswered: {unanswered}")
+
+    async with llm_slot(BACKGROUND):
+        completion = await asyncio.wait_for(
+            client.chat.completions.create(
+                model=SCORING_MODEL,
+                messages=[
+                    {"role": "system", "content": SUMMARY_PROMPT},
+                    {"role": "user", "content": "\n".join(lines)}
+                ],
+                temperature=0.3,
+                max_completion_tokens=400,
+                response_format={"type": "json_object"}
+            ),
+            timeout=FEEDBACK_TIMEOUT_SEC,
+        )
+    summary = json.loads(completion.choices[0].message.content)
+    return {
+        "rating": round((technical + communication + english) / 3),
+        "technicalScore": round(technical),
+        "communicationScore": round(communication),
+        "englishScore": round(english),
+        "feedbackText": summary.get("feedbackText", "No feedback generated."),
+    }
+
+def feedback_payload(feedback: Feedback):
+    """What the feedback-ready event carries: the row minus timestamps."""
+    return {
+        "id": feedback.id,
+        "rating": feedback.rating,
+        "englishScore": feedback.englishScore,
+        "technicalScore": feedback.technicalScore,
+        "communicationScore": feedback.communicationScore,
+        "feedbackText": feedback.feedbackText,
+    }
 
 async def generate_feedback(interview_id: str):
+    """
+    Generates and stores feedback for a finished interview. LLM failures are
+    raised so the feedback queue can retry; an existing Feedback row is a no-op.
+    No database connection is held while waiting on scoring or the LLM.
+    """
+    # 0. Already done (another trigger won the race)? Skip the expensive call.
+    async with AsyncSessionLocal() as db:
+        existing = await db.execute(select(Feedback.id).where(Feedback.interviewId == interview_id))
+        if existing.first():
+            return
+
+    # Answers are scored in the background during the interview; let the last ones land
+    await wait_for_scoring(interview_id)
+
+    # 1. Fetch Interview Data (kept usable after the session closes: expire_on_commit=False)
     async with AsyncSessionLocal() as db:
-        # 1. Fetch Interview Data
         result = await db.execute(
             select(Interview)
             .where(Interview.id == interview_id)
             .options(selectinload(Interview.questions))
         )
         interview = result.scalars().first()
-        
-        if not interview or not interview.questions:
-            print(f"Skipping feedback for {interview_id}: No data.")
-            return
 
-        # 2. Build Transcript
-        transcript = f"Interview Topic: {interview.topic}\n"
-        transcript += f"Difficulty: {interview.difficulty}\n"
-        transcript += f"Seniority: {interview.seniority}\n"
-        if interview.concept:
-            transcript += f"Specific Concept: {interview.concept}\n"
-        
-        transcript += "\n--- TRANSCRIPT ---\n"
-        for q in interview.questions:
-            transcript += f"AI: {q.question}\n"
-            transcript += f"Candidate: {q.userAnswer or '(No Answer)'}\n\n"
-
-        # 3. Prompt LLM
-        FEEDBACK_PROMPT = """
-        You are an expert technical interviewer. Analyze the following interview transcript.
-        Provide a structured evaluation in JSON format with the following keys:
-        - rating: Overall score (1-10)
-        - englishScore: Rating of English proficiency, grammar, and fluency (1-10)
-        - technicalScore: Rating of technical correctness and depth (1-10)
-        - communicationScore: Rating of clarity and articulation (1-10)
-        - feedbackText: A detailed summary of strengths, weaknesses, and areas for improvement.
-
-        Return ONLY the valid JSON object.
-        """
+    if not interview or not interview.questions:
+        print(f"Skipping feedback for {interview_id}: No data.")
+        return
+
+    # 2. Every answer already scored: cheap aggregation instead of the full transcript call
+    questions = sorted(interview.questions, key=lambda q: q.createdAt)
+    answered = [q for q in questions if q.userAnswer]
+    if INCREMENTAL_SCORING and answered and all(q.technicalScore is not None for q in answered):
+        result_json = await summarize_scored(interview, answered, len(questions) - len(answered))
+    else:
+        result_json = await evaluate_transcript(interview, questions)
 
+    # 3. Save to DB: feedback, progress rollups and the final status in one transaction
+    async with AsyncSessionLocal() as db:
         try:
-            completion = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
+            new_feedback = Feedback(
+                interviewId=interview.id,
+                rating=result_json.get("rating", 0),
+                englishScore=result_json.get("englishScore", 0),
+                technicalScore=result_json.get("technicalScore", 0),
+                communicationScore=result_json.get("communicationScore", 0),
+                feedbackText=result_json.get("feedbackText", "No feedback generated.")
+            )
+            db.add(new_feedback)
+            await record_feedback(db, interview, new_feedback)
+            await db.execute(
+                update(Interview)
+                .where(Interview.id == interview.id)
+                .values(status="COMPLETED", endTime=interview.endTime or datetime.now(timezone.utc))
+            )
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            print(f"Feedback already exists for {interview_id}. Skipping.")
+            return
+
+    # Announced once the interview row is final too, so nothing cached from it goes stale
+    await feedback_notifier.publish(interview_id, feedback_payload(new_feedback))
+
+    print(f"Feedback generated for {interview_id}")
+
+async def evaluate_transcript(interview, questions):
+    """Full-transcript evaluation, used when per-answer scores are missing."""
+    # Build Transcript
+    transcript = f"Interview Topic: {interview.topic}\n"
+    transcript += f"Difficulty: {interview.difficulty}\n"
+    transcript += f"Seniority: {interview.seniority}\n"
+    if interview.concept:
+        transcript += f"Specific Concept: {interview.concept}\n"
+
+    transcript += "\n--- TRANSCRIPT ---\n"
+    for q in questions:
+        transcript += f"AI: {q.question}\n"
+        transcript += f"Candidate: {q.userAnswer or '(No Answer)'}\n\n"
+
+    # Prompt LLM
+    FEEDBACK_PROMPT = """
+    You are an expert technical interviewer. Analyze the following interview transcript.
+    Provide a structured evaluation in JSON format with the following keys:
+    - rating: Overall score (1-10)
+    - englishScore: Rating of English proficiency, grammar, and fluency (1-10)
+    - technicalScore: Rating of technical correctness and depth (1-10)
+    - communicationScore: Rating of clarity and articulation (1-10)
+    - feedbackText: A detailed summary of strengths, weaknesses, and areas for improvement.
+
+    Return ONLY the valid JSON object.
+    """
+
+    async with llm_slot(BACKGROUND):
+        completion = await asyncio.wait_for(
+            client.chat.completions.create(
+                model=LLM_MODEL,
                 messages=[
                     {"role": "system", "content": FEEDBACK_PROMPT},
                     {"role": "user", "content": transcript}
                 ],
                 temperature=0.3,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                timeout=FEEDBACK_TIMEOUT_SEC
+            ),
+            timeout=FEEDBACK_TIMEOUT_SEC,
+        )
+    return json.loads(completion.choices[0].message.content)
+
+async def write_fallback_feedback(interview_id: str):
+    # Retries exhausted: leave a placeholder so the results page doesn't wait forever
+    async with AsyncSessionLocal() as db:
+        try:
+            fallback = Feedback(
+                interviewId=interview_id,
+                rating=0,
+                feedbackText="Automated analysis failed or insufficient data. Please review the transcript manually."
             )
-            
-            result_json = json.loads(completion.choices[0].message.content)
-            
-            # 4. Save to DB
-            try:
-                new_feedback = Feedback(
-                    interviewId=interview.id,
-                    rating=result_json.get("rating", 0),
-                    englishScore=result_json.get("englishScore", 0),
-                    technicalScore=result_json.get("technicalScore", 0),
-                    communicationScore=result_json.get("communicationScore", 0),
-                    feedbackText=result_json.get("feedbackText", "No feedback generated.")
-                )
-                db.add(new_feedback)
-                await db.commit()
-            except IntegrityError:
-                await db.rollback()
-                print(f"Feedback already exists for {interview_id}. Skipping.")
-                return
-            except Exception as e:
-                await db.rollback()
-                print(f"Feedback creation error: {e}")
-                # Dont raise, just fail gracefully
-                pass
-            
-            # Update status
-            # Reload interview to be safe or just use object if attached
-            interview.status = "COMPLETED"
-            interview.endTime = datetime.now(timezone.utc)
-            db.add(interview) # Merges if detached but here it is persistent
+            db.add(fallback)
             await db.commit()
-            
-            print(f"Feedback generated for {interview_id}")
-
-        except Exception as e:
-            print(f"Feedback generation error: {e}")
-            # Optionally, create a dummy feedback record saying "Analysis Failed"
-            try:
-                # We need a new transaction or rollback previous if failed
-                 await db.rollback()
-                 new_feedback = Feedback(
-                    interviewId=interview.id,
-                    rating=0,
-                    feedbackText="Automated analysis failed or insufficient data. Please review the transcript manually."
-                )
-                 db.add(new_feedback)
-                 await db.commit()
-            except:
-                 pass
+        except IntegrityError:
+            await db.rollback()
+            return
+        await feedback_notifier.publish(interview_id, feedback_payload(fallback))
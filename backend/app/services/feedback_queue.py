@@ -0,0 +1,200 @@
+import os
+import glob
+import json
+import time
+import asyncio
+from collections import OrderedDict, deque
+from dotenv import load_dotenv
+
+from app.services.feedback import generate_feedback, write_fallback_feedback
+
+load_dotenv()
+
+FEEDBACK_WORKERS = int(os.getenv("FEEDBACK_WORKERS", "4"))
+FEEDBACK_MAX_QUEUE = int(os.getenv("FEEDBACK_MAX_QUEUE", "1000"))
+FEEDBACK_MAX_ATTEMPTS = int(os.getenv("FEEDBACK_MAX_ATTEMPTS", "4"))
+FEEDBACK_RETRY_BASE_SEC = float(os.getenv("FEEDBACK_RETRY_BASE_SEC", "2"))
+# Each worker mirrors its jobs to its own file: <root>.<pid><ext>
+FEEDBACK_BACKLOG_PATH = os.getenv("FEEDBACK_BACKLOG_PATH", ".cache/feedback_backlog.json")
+
+RECENT_DONE = 4096
+
+def worker_backlog_path(base: str, pid: int = None):
+    root, ext = os.path.splitext(base)
+    return f"{root}.{pid or os.getpid()}{ext}"
+
+def _pid_alive(pid: int):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class FeedbackQueue:
+    """
+    Bounded, deduplicated queue of feedback jobs served by a small worker pool.
+    Pending jobs are mirrored to a per-worker JSON file; on start a worker adopts
+    the files of workers that are gone (its own included), so a restart picks
+    their jobs up once.
+    """
+    def __init__(self, workers: int = FEEDBACK_WORKERS, max_queue: int = FEEDBACK_MAX_QUEUE,
+                 backlog_path: str = FEEDBACK_BACKLOG_PATH):
+        self.workers = workers
+        self.backlog_base = backlog_path
+        self.backlog_path = worker_backlog_path(backlog_path) if backlog_path else ""
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.pending = {}          # interview_id -> {"attempts": n, "enqueued_at": ts}
+        self.done = OrderedDict()  # recently finished ids, to drop late duplicate triggers cheaply
+        self.tasks = []
+        self.in_flight = 0
+        self.persist_lock = asyncio.Lock()
+        self.latencies = deque(maxlen=500)
+        self.counts = {"enqueued": 0, "deduped": 0, "rejected": 0, "processed": 0, "retried": 0, "failed": 0}
+
+    def enqueue(self, interview_id: str):
+        """Schedules feedback for an interview; returns False for duplicates or when full."""
+        if interview_id in self.pending or interview_id in self.done:
+            self.counts["deduped"] += 1
+            return False
+        job = {"attempts": 0, "enqueued_at": time.time()}
+        try:
+            self.queue.put_nowait(interview_id)
+        except asyncio.QueueFull:
+            self.counts["rejected"] += 1
+            print(f"Feedback queue full, dropping {interview_id}")
+            return False
+        self.pending[interview_id] = job
+        self.counts["enqueued"] += 1
+        self._persist_soon()
+        return True
+
+    async def start(self):
+        jobs, claimed = await asyncio.to_thread(self._claim_orphans)
+        for interview_id, job in jobs.items():
+            if interview_id not in self.pending and not self.queue.full():
+                self.pending[interview_id] = job
+                self.queue.put_nowait(interview_id)
+        if claimed:
+            # Adopted jobs are in our own file before the claimed ones go away
+            await self._persist()
+            await asyncio.to_thread(lambda: [os.remove(p) for p in claimed])
+        if self.pending:
+            print(f"Feedback backlog restored: {len(self.pending)} job(s)")
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for t in self.tasks:
+            t.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        await self._persist()
+
+    async def _worker(self):
+        while True:
+            interview_id = await self.queue.get()
+            job = self.pending.get(interview_id)
+            if job is None:
+                continue
+            job["attempts"] += 1
+            self.in_flight += 1
+            try:
+                await generate_feedback(interview_id)
+                self._finish(interview_id, job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Feedback generation error for {interview_id} (attempt {job['attempts']}): {e}")
+                if job["attempts"] >= FEEDBACK_MAX_ATTEMPTS:
+                    self.counts["failed"] += 1
+                    try:
+                        await write_fallback_feedback(interview_id)
+                    except Exception as e:
+                        print(f"Fallback feedback error for {interview_id}: {e}")
+                    self._finish(interview_id, job)
+                else:
+                    self.counts["retried"] += 1
+                    delay = FEEDBACK_RETRY_BASE_SEC * 2 ** (job["attempts"] - 1)
+                    asyncio.create_task(self._requeue(interview_id, delay))
+            finally:
+                self.in_flight -= 1
+
+    async def _requeue(self, interview_id, delay):
+        await asyncio.sleep(delay)
+        await self.queue.put(interview_id)
+
+    def _finish(self, interview_id, job):
+        self.pending.pop(interview_id, None)
+        self.done[interview_id] = True
+        if len(self.done) > RECENT_DONE:
+            self.done.popitem(last=False)
+        self.counts["processed"] += 1
+        self.latencies.append(time.time() - job["enqueued_at"])
+        self._persist_soon()
+
+    def _claim_orphans(self):
+        """
+        Takes over backlog files whose worker is no longer running, including a
+        previous run under this PID (plus the old shared file). A rename claims each one, so two starting workers never
+        both adopt it. Returns the jobs and the claimed paths.
+        """
+        if not self.backlog_base:
+            return {}, []
+        root, ext = os.path.splitext(self.backlog_base)
+        jobs, claimed = {}, []
+        for path in glob.glob(f"{glob.escape(root)}.*{ext}") + [self.backlog_base]:
+            pid = path[len(root) + 1:len(path) - len(ext)]
+            # Our own file is from an earlier process with this PID (PID 1 in a container): adopt it too
+            if path not in (self.backlog_base, self.backlog_path) and (not pid.isdigit() or _pid_alive(int(pid))):
+                continue
+            claim = f"{path}.{os.getpid()}.claim"
+            try:
+                os.rename(path, claim)
+            except FileNotFoundError:
+                continue
+            claimed.append(claim)
+            try:
+                with open(claim) as f:
+                    jobs.update(json.load(f))
+            except ValueError:
+                pass
+        return jobs, claimed
+
+    def _write(self, jobs):
+        if not jobs:
+            # Nothing pending: no file left behind for another worker to adopt
+            if os.path.exists(self.backlog_path):
+                os.remove(self.backlog_path)
+            return
+        os.makedirs(os.path.dirname(self.backlog_path) or ".", exist_ok=True)
+        tmp = self.backlog_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(jobs, f)
+        os.replace(tmp, self.backlog_path)
+
+    def _persist_soon(self):
+        if self.backlog_path:
+            asyncio.create_task(self._persist())
+
+    async def _persist(self):
+        if not self.backlog_path:
+            return
+        async with self.persist_lock:
+            try:
+                await asyncio.to_thread(self._write, dict(self.pending))
+            except OSError as e:
+                print("Feedback backlog write failed:", e)
+
+    def stats(self):
+        lat = sorted(self.latencies)
+        return {
+            "depth": self.queue.qsize(),
+            "pending": len(self.pending),
+            "in_flight": self.in_flight,
+            **self.counts,
+            "latency_p50_sec": round(lat[len(lat) // 2], 3) if lat else None,
+            "latency_p95_sec": round(lat[int(len(lat) * 0.95)], 3) if lat else None,
+        }
+
+feedback_queue = FeedbackQueue()
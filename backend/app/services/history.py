@@ -0,0 +1,153 @@
+import os
+import asyncio
+from dotenv import load_dotenv
+
+from app.services.llm import client, llm_slot
+from app.services.capacity import BACKGROUND
+
+load_dotenv()
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "2500"))
+HISTORY_KEEP_TURNS = int(os.getenv("HISTORY_KEEP_TURNS", "6"))  # recent messages kept verbatim
+HISTORY_SUMMARY_MODEL = os.getenv("HISTORY_SUMMARY_MODEL", "llama-3.1-8b-instant")
+HISTORY_SUMMARY_TIMEOUT_SEC = float(os.getenv("HISTORY_SUMMARY_TIMEOUT_SEC", "20"))
+
+SUMMARY_PROMPT = """
+You keep notes for an AI technical interviewer. Merge the previous notes and the new exchanges
+into updated notes (max 120 words): which concepts were already asked about, and how well the
+candidate answered each. Return only the notes.
+"""
+
+def estimate_tokens(text: str):
+    # ~4 characters per token for English, plus per-message overhead; good enough for budgeting
+    return len(text) // 4 + 4
+
+class ConversationHistory:
+    """
+    LLM context for one interview, kept within a token budget. The system prompt
+    and the last HISTORY_KEEP_TURNS messages are sent verbatim; once the whole
+    history outgrows the budget, older turns are folded into a rolling summary
+    in the background. Time warnings are passed
+    per call and never stored.
+    """
+    def __init__(self, system_prompt: str, token_budget: int = HISTORY_TOKEN_BUDGET,
+                 keep_turns: int = HISTORY_KEEP_TURNS):
+        self.system_prompt = system_prompt
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.turns = []
+        self.summary = ""
+        self.summary_task = None
+        self.usage = []
+        # Checkpoint bookkeeping, in absolute turn numbers: turns folded into the
+        # summary so far, and what the session store holds
+        self.dropped = 0
+        self.stored_dropped = 0
+        self.stored_turns = 0
+        self.stored_summary = ""
+
+    def add_user(self, content: str):
+        self.turns.append({"role": "user", "content": content})
+
+    def add_assistant(self, content: str):
+        self.turns.append({"role": "assistant", "content": content})
+        self.maybe_summarize()
+
+    def prompt(self, notes=(), user_text: str = None):
+        """Messages for the next reply: system prompt, summary, recent turns, then one-off notes."""
+        head = [{"role": "system", "content": self.system_prompt}]
+        if self.summary:
+            head.append({"role": "system", "content": f"Interview so far (summary): {self.summary}"})
+        tail = [{"role": "user", "content": user_text}] if user_text else []
+        tail += [{"role": "system", "content": n} for n in notes]
+
+        budget = self.token_budget - sum(estimate_tokens(m["content"]) for m in head + tail)
+        recent = []
+        for i, m in enumerate(reversed(self.turns)):
+            cost = estimate_tokens(m["content"])
+            # Never drop the last few turns, even if a long answer blows the budget
+            if i >= self.keep_turns and cost > budget:
+                break
+            recent.append(m)
+            budget -= cost
+        return head + recent[::-1] + tail
+
+    def estimated_tokens(self):
+        """Size of the prompt if every stored turn were sent, before prompt() trims anything."""
+        head = [self.system_prompt] + ([self.summary] if self.summary else [])
+        return sum(estimate_tokens(t) for t in head) + sum(estimate_tokens(m["content"]) for m in self.turns)
+
+    def maybe_summarize(self):
+        # Each fold is an extra LLM call: only once the whole history no longer fits the budget
+        if len(self.turns) <= self.keep_turns or self.estimated_tokens() <= self.token_budget:
+            return
+        if self.summary_task and not self.summary_task.done():
+            return
+        fold = self.turns[:len(self.turns) - self.keep_turns]
+        self.summary_task = asyncio.create_task(self._summarize(fold))
+
+    async def _summarize(self, fold):
+        exchanges = "\n".join(f"{m['role']}: {m['content']}" for m in fold)
+        try:
+            async with llm_slot(BACKGROUND):
+                completion = await asyncio.wait_for(
+                    client.chat.completions.create(
+                        model=HISTORY_SUMMARY_MODEL,
+                        messages=[
+                            {"role": "system", "content": SUMMARY_PROMPT},
+                            {"role": "user", "content": f"Previous notes: {self.summary or '(none)'}\n\nNew exchanges:\n{exchanges}"}
+                        ],
+                        temperature=0.2,
+                        max_completion_tokens=250
+                    ),
+                    timeout=HISTORY_SUMMARY_TIMEOUT_SEC,
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Keep the turns; prompt() still trims them to the budget
+            print(f"History summary error: {e}")
+            return
+        self.summary = completion.choices[0].message.content.strip()
+        # Turns appended meanwhile stay; only the folded prefix is dropped
+        if self.turns[:len(fold)] == fold:
+            del self.turns[:len(fold)]
+            self.dropped += len(fold)
+
+    def restore(self, summary: str, turns: list, stored: bool = True):
+        """
+        Loads a checkpoint written by checkpoint(), e.g. on another worker. With
+        stored=False (turns rebuilt from the transcript) the next checkpoint ships them.
+        """
+        self.summary = summary
+        self.stored_summary = summary if stored else ""
+        self.turns = list(turns)
+        self.dropped = self.stored_dropped = 0
+        self.stored_turns = len(turns) if stored else 0
+        self.maybe_summarize()
+
+    async def checkpoint(self, store, sid: str):
+        """Ships only what changed since the last checkpoint: new turns and, after a fold, the summary."""
+        if self.summary != self.stored_summary or self.dropped > self.stored_dropped:
+            await store.set_summary(sid, self.summary, min(self.dropped, self.stored_turns) - self.stored_dropped)
+            self.stored_summary = self.summary
+            self.stored_dropped = self.dropped
+        start = max(self.stored_turns, self.dropped)
+        new = self.turns[start - self.dropped:]
+        if new:
+            await store.append_turns(sid, new)
+        self.stored_turns = self.dropped + len(self.turns)
+
+    def record_usage(self, messages, usage: dict):
+        entry = {
+            "estimated_prompt_tokens": sum(estimate_tokens(m["content"]) for m in messages),
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "completion_tokens": usage.get("completion_tokens"),
+        }
+        self.usage.append(entry)
+        del self.usage[:-50]
+        return entry
+
+    def close(self):
+        if self.summary_task and not self.summary_task.done():
+            self.summary_task.cancel()
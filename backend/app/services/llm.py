@@ -1,11 +1,36 @@
 import os
-from groq import Groq
+import asyncio
+import httpx
+from groq import AsyncGroq
 from dotenv import load_dotenv
 
+from app.services.session import current_session
+from app.services.capacity import capacity, INTERACTIVE
+
 load_dotenv()
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-client = Groq(api_key=GROQ_API_KEY)
+LLM_MODEL = os.getenv("LLM_MODEL", "llama-3.3-70b-versatile")
+LLM_TIMEOUT_SEC = float(os.getenv("LLM_TIMEOUT_SEC", "15"))
+LLM_CONNECT_TIMEOUT_SEC = float(os.getenv("LLM_CONNECT_TIMEOUT_SEC", "5"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+
+# One pooled HTTP client for the whole process. Every interview (and the feedback
+# generator) shares these keep-alive connections instead of paying a TLS handshake
+# per call, and none of the calls block the event loop.
+http_client = httpx.AsyncClient(
+    limits=httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE,
+    ),
+    timeout=httpx.Timeout(LLM_TIMEOUT_SEC, connect=LLM_CONNECT_TIMEOUT_SEC),
+)
+client = AsyncGroq(api_key=GROQ_API_KEY, http_client=http_client, max_retries=1)
+
+def llm_slot(priority: int = INTERACTIVE):
+    """One of the LLM_MAX_IN_FLIGHT request slots, shared fairly between interviews."""
+    return capacity.llm.slot(current_session.get(), priority)
 
 SYSTEM_PROMPT = """You are an AI technical interviewer.
 Ask exactly one question at a time.
@@ -13,15 +38,41 @@ Do not explain or teach.
 Keep a neutral tone.
 """
 
-def ask_llm(history):
+async def stream_llm(history, timeout: float = LLM_TIMEOUT_SEC, usage: dict = None):
+    """
+    Yields the reply as it is generated (text deltas). Errors propagate to the
+    caller, which knows whether anything has already been spoken. If a dict is
+    passed as usage, it receives the prompt/completion token counts.
+    The request slot is held until the stream ends; waiting for it counts
+    against the timeout.
+    """
+    await asyncio.wait_for(capacity.llm.acquire(current_session.get(), INTERACTIVE), timeout=timeout)
     try:
-        r = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "system", "content": SYSTEM_PROMPT}, *history],
-            temperature=0.3,
-            max_completion_tokens=250
+        stream = await asyncio.wait_for(
+            client.chat.completions.create(
+                model=LLM_MODEL,
+                messages=[{"role": "system", "content": SYSTEM_PROMPT}, *history],
+                temperature=0.3,
+                max_completion_tokens=250,
+                stream=True
+            ),
+            timeout=timeout,
         )
-        return r.choices[0].message.content
-    except Exception as e:
-        print(f"LLM Error: {e}")
-        return "I'm sorry, I encountered an error. Could you repeat that?"
+        try:
+            async for chunk in stream:
+                u = chunk.usage or (chunk.x_groq.usage if chunk.x_groq else None)
+                if u and usage is not None:
+                    usage["prompt_tokens"] = u.prompt_tokens
+                    usage["completion_tokens"] = u.completion_tokens
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        finally:
+            await stream.close()
+    finally:
+        capacity.llm.release()
+
+async def close_llm_client():
+    await client.close()
@@ -0,0 +1,105 @@
+import time
+from collections import deque
+
+SUMMARY_WINDOW = 2048  # recent samples kept per series for quantiles
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Turn stages: name -> (start mark, end mark). Marks are perf_counter() stamps set by TurnTrace.
+TURN_STAGES = {
+    "endpointing": ("stt_partial", "silence_fired"),
+    "db_write": ("silence_fired", "db_written"),
+    "llm_first_token": ("silence_fired", "llm_first_token"),
+    "llm_complete": ("silence_fired", "llm_last_token"),
+    "tts_first_byte": ("llm_first_token", "tts_first_byte"),
+    "tts_stream": ("tts_first_byte", "tts_last_byte"),
+    "first_audio": ("silence_fired", "client_first_byte"),
+    "speech_to_audio": ("stt_partial", "client_first_byte"),
+}
+
+class Summary:
+    """Count, sum and quantiles over a sliding window of recent observations."""
+    __slots__ = ("samples", "count", "sum")
+
+    def __init__(self):
+        self.samples = deque(maxlen=SUMMARY_WINDOW)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.samples.append(value)
+        self.count += 1
+        self.sum += value
+
+    def quantiles(self):
+        values = sorted(self.samples)
+        if not values:
+            return {q: 0.0 for q in QUANTILES}
+        return {q: values[min(len(values) - 1, int(len(values) * q))] for q in QUANTILES}
+
+class Metrics:
+    """
+    Process-wide registry rendered in the Prometheus text format. Observing is
+    a dict lookup and a deque append; all sorting happens at scrape time.
+    """
+    def __init__(self):
+        self.summaries = {}  # (name, label value) -> Summary
+        self.help = {}
+        self.levels = {}     # live counts kept by the code that opens/closes things (e.g. sockets)
+
+    def summary(self, name: str, help_text: str, label: str = None):
+        self.help[name] = (help_text, label)
+
+    def add(self, name: str, delta: int = 1):
+        self.levels[name] = self.levels.get(name, 0) + delta
+
+    def observe(self, name: str, value: float, label_value: str = None):
+        series = self.summaries.get((name, label_value))
+        if series is None:
+            series = self.summaries[(name, label_value)] = Summary()
+        series.observe(value)
+
+    def render(self, gauges: dict):
+        """Summaries plus point-in-time gauges ({name: (help, value)})."""
+        lines = []
+        for name, (help_text, label) in self.help.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} summary")
+            for (series_name, label_value), series in sorted(self.summaries.items(), key=lambda kv: str(kv[0])):
+                if series_name != name:
+                    continue
+                labels = f'{label}="{label_value}"' if label else ""
+                sep = "," if labels else ""
+                for q, v in series.quantiles().items():
+                    lines.append(f'{name}{{{labels}{sep}quantile="{q}"}} {v:.6f}')
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{name}_sum{suffix} {series.sum:.6f}")
+                lines.append(f"{name}_count{suffix} {series.count}")
+        for name, (help_text, value) in gauges.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+metrics.summary("interview_turn_stage_seconds", "Latency of each stage of a conversational turn.", "stage")
+metrics.summary("interview_llm_prompt_tokens", "Prompt tokens sent to the LLM per turn.")
+
+class TurnTrace:
+    """Timestamps for one candidate turn; finish() turns them into stage latencies."""
+    __slots__ = ("marks",)
+
+    def __init__(self):
+        self.marks = {}
+
+    def mark(self, name: str):
+        self.marks[name] = time.perf_counter()
+
+    def mark_once(self, name: str):
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter()
+
+    def finish(self):
+        marks = self.marks
+        for stage, (start, end) in TURN_STAGES.items():
+            if start in marks and end in marks:
+                metrics.observe("interview_turn_stage_seconds", max(0.0, marks[end] - marks[start]), stage)
@@ -0,0 +1,111 @@
+import os
+import json
+import uuid
+import asyncio
+from dotenv import load_dotenv
+
+from app.services.session import SESSION_STORE, SESSION_REDIS_URL
+
+load_dotenv()
+
+# "memory" notifies waiters on this worker only; "redis" also fans out to the other workers
+FEEDBACK_NOTIFY = os.getenv("FEEDBACK_NOTIFY", SESSION_STORE)
+FEEDBACK_CHANNEL = "interview:feedback-ready"
+
+class FeedbackNotifier:
+    """
+    In-process fan-out of "feedback is ready" to everyone waiting on an
+    interview. publish() delivers locally, then hands the event to forward(),
+    the hook for reaching other workers; their events come back in via deliver().
+    Listeners (e.g. cache invalidation) run on every worker for every event.
+    """
+    def __init__(self):
+        self.waiters = {}  # interview_id -> set of futures
+        self.listeners = []
+        self.published = 0
+
+    def subscribe(self, interview_id: str):
+        fut = asyncio.get_running_loop().create_future()
+        self.waiters.setdefault(interview_id, set()).add(fut)
+        return fut
+
+    def unsubscribe(self, interview_id: str, fut):
+        waiting = self.waiters.get(interview_id)
+        if waiting is None:
+            return
+        waiting.discard(fut)
+        if not waiting:
+            del self.waiters[interview_id]
+
+    def deliver(self, interview_id: str, payload: dict):
+        for listener in self.listeners:
+            listener(interview_id, payload)
+        for fut in self.waiters.pop(interview_id, ()):
+            if not fut.done():
+                fut.set_result(payload)
+
+    async def publish(self, interview_id: str, payload: dict):
+        self.published += 1
+        self.deliver(interview_id, payload)
+        try:
+            await self.forward(interview_id, payload)
+        except Exception as e:
+            print(f"Feedback notify error for {interview_id}: {e}")
+
+    async def forward(self, interview_id: str, payload: dict):
+        pass
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def stats(self):
+        return {"waiters": sum(len(w) for w in self.waiters.values()), "published": self.published}
+
+class RedisFeedbackNotifier(FeedbackNotifier):
+    """Forwards events over Redis pub/sub; each worker skips the ones it sent itself."""
+    def __init__(self, url: str = SESSION_REDIS_URL):
+        super().__init__()
+        import redis.asyncio as redis
+        self.redis = redis.from_url(url, decode_responses=True)
+        self.origin = uuid.uuid4().hex
+        self.listener = None
+
+    async def forward(self, interview_id, payload):
+        message = {"origin": self.origin, "interview_id": interview_id, "payload": payload}
+        await self.redis.publish(FEEDBACK_CHANNEL, json.dumps(message))
+
+    async def start(self):
+        self.listener = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(FEEDBACK_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        data = json.loads(message["data"])
+                        if data.get("origin") != self.origin:
+                            self.deliver(data["interview_id"], data["payload"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Feedback notify subscription lost: {e}")
+                await asyncio.sleep(1)
+
+    async def close(self):
+        if self.listener:
+            self.listener.cancel()
+            await asyncio.gather(self.listener, return_exceptions=True)
+        await self.redis.aclose()
+
+def create_feedback_notifier(kind: str = FEEDBACK_NOTIFY):
+    if kind == "redis":
+        return RedisFeedbackNotifier()
+    return FeedbackNotifier()
+
+feedback_notifier = create_feedback_notifier()
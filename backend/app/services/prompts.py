@@ -0,0 +1,50 @@
+# Interview prompts and the fixed lines the interviewer speaks. Fixed lines are
+# identical across interviews, so their audio is served from the TTS cache.
+
+CLOSING_REPLY = "Our time is up. Thank you for your responses. I will now end the interview."
+TIME_UP_REPLY = "Time is up."
+REPEAT_REPLY = "Could you repeat that?"
+
+FIXED_UTTERANCES = [CLOSING_REPLY, TIME_UP_REPLY, REPEAT_REPLY]
+
+SHORT_QUESTION_NOTE = "You have less than 40 seconds remaining. Ask exactly one very short, simple question that can be answered in 20 seconds. Do not conclude yet."
+CONCLUDE_NOTE = "Time is almost up. Conclude the interview now with a closing statement."
+
+def build_system_prompt(topic, seniority, difficulty, concept=None):
+    prompt = f"""You are an AI technical interviewer conducting a {seniority or 'Mid-Level'} interview about {topic}.
+    Difficulty: {difficulty}.
+    """
+    if concept:
+        prompt += f"\nFocus specifically on checking knowledge of: {concept}."
+
+    prompt += """
+    \nRules:
+    - Ask exactly ONE question at a time.
+    - Keep questions short.
+    - Never teach, hint, explain, or correct.
+    - Explore different concepts within the domain; do not stay on one topic.
+    - You may ask at most ONE follow-up question based on the previous answer.
+    - Do not ask multiple follow-ups on the same concept.
+    - If the candidate struggles, switch to a simpler or adjacent concept without explanation.
+    - Keep questions concise and neutral.
+    """
+    return prompt
+
+def build_first_question(topic, concept=None):
+    question = f"Hello. I'm your AI interviewer. Let's start with a interview about {topic}."
+    if concept:
+        question += f" We may touch on concepts related to {concept}."
+    question += " Let’s begin. Please briefly introduce yourself."
+    return question
+
+def time_notes(time_left):
+    """System notes to add before the next reply; returns (notes, is_final)."""
+    notes = []
+    # 20s < Time < 40s: FORCE short question
+    if 20 < time_left < 40:
+        notes.append(SHORT_QUESTION_NOTE)
+    # <= 15s: Conclusion
+    if time_left <= 15:
+        notes.append(CONCLUDE_NOTE)
+        return notes, True
+    return notes, False
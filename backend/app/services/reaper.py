@@ -0,0 +1,116 @@
+import os
+import asyncio
+from datetime import datetime, timezone, timedelta
+from dotenv import load_dotenv
+from sqlalchemy import select, update, desc
+
+from app.core.database import AsyncSessionLocal
+from app.models import Interview, Question
+from app.services.session import session_store
+from app.services.feedback_queue import feedback_queue
+from app.services.tts_cache import pending_audio
+
+load_dotenv()
+
+# How long an interview whose socket dropped stays resumable before it is completed
+RECONNECT_GRACE_SEC = float(os.getenv("RECONNECT_GRACE_SEC", "120"))
+
+_reapers = {}  # interview_id -> pending reap task on this worker
+
+async def finalize_interview(interview_id: str):
+    """
+    Completes an interview nobody is connected to: words still buffered in its
+    checkpoint become the last answer, the row is marked COMPLETED, the
+    checkpoint goes and feedback is queued. Safe to run more than once.
+    """
+    saved = await session_store.load(interview_id)
+    buffered = " ".join((saved or {}).get("state", {}).get("buffer") or []).strip()
+    async with AsyncSessionLocal() as db:
+        if buffered:
+            result = await db.execute(
+                select(Question)
+                .where(Question.interviewId == interview_id)
+                .order_by(desc(Question.createdAt))
+                .limit(1)
+            )
+            last_q = result.scalars().first()
+            if last_q:
+                last_q.userAnswer = f"{last_q.userAnswer} {buffered}" if last_q.userAnswer else buffered
+                # Any score was for the shorter answer; feedback re-reads the transcript instead
+                last_q.technicalScore = None
+        await db.execute(
+            update(Interview)
+            .where(Interview.id == interview_id, Interview.status != "COMPLETED")
+            .values(status="COMPLETED", endTime=datetime.now(timezone.utc))
+        )
+        await db.commit()
+    await session_store.delete(interview_id)
+    pending_audio.drop(interview_id)
+    feedback_queue.enqueue(interview_id)
+
+async def _reap(interview_id: str, delay: float):
+    try:
+        await asyncio.sleep(delay)
+        # Resumed meanwhile, on this worker or another one
+        if await session_store.owner(interview_id):
+            return
+        await finalize_interview(interview_id)
+        print(f"Interview {interview_id} abandoned, completed after {delay:.0f}s")
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"Reaping {interview_id} failed: {e}")
+    finally:
+        if _reapers.get(interview_id) is asyncio.current_task():
+            del _reapers[interview_id]
+
+def schedule_reap(interview_id: str, delay: float = RECONNECT_GRACE_SEC):
+    """Completes the interview after the grace period unless a connection claims it first."""
+    cancel_reap(interview_id)
+    _reapers[interview_id] = asyncio.create_task(_reap(interview_id, delay))
+
+def cancel_reap(interview_id: str):
+    task = _reapers.pop(interview_id, None)
+    if task:
+        task.cancel()
+
+async def sweep_abandoned():
+    """
+    Startup: reaps are in-memory, so interviews dropped just before a restart
+    have none. Those past their end plus the grace period are completed now;
+    the others get a fresh grace period to reconnect. Interviews with a live
+    connection (on any worker) are left alone.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Interview.id, Interview.startTime, Interview.duration)
+                .where(Interview.status == "IN_PROGRESS", Interview.startTime.is_not(None))
+            )
+            rows = result.all()
+    except Exception as e:
+        print(f"Abandoned interview sweep failed: {e}")
+        return
+    now = datetime.now(timezone.utc)
+    finalized = scheduled = 0
+    for interview_id, start_time, duration in rows:
+        try:
+            if interview_id in _reapers or await session_store.owner(interview_id):
+                continue
+            start = start_time if start_time.tzinfo else start_time.replace(tzinfo=timezone.utc)
+            deadline = start + timedelta(minutes=duration or 15, seconds=RECONNECT_GRACE_SEC)
+            if deadline <= now:
+                await finalize_interview(interview_id)
+                finalized += 1
+            else:
+                schedule_reap(interview_id)
+                scheduled += 1
+        except Exception as e:
+            print(f"Sweeping {interview_id} failed: {e}")
+    if finalized or scheduled:
+        print(f"Abandoned interviews: {finalized} completed, {scheduled} awaiting reconnect")
+
+def cancel_all_reaps():
+    # Shutdown: interviews in their grace period stay IN_PROGRESS; the next start's sweep picks them up
+    for interview_id in list(_reapers):
+        cancel_reap(interview_id)
@@ -0,0 +1,64 @@
+import os
+import hashlib
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+INTERVIEW_CACHE_MAX_BYTES = int(os.getenv("INTERVIEW_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+def make_etag(*parts):
+    """Strong ETag over the given values (ids, timestamps) or raw bytes."""
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode())
+        h.update(b"\0")
+    return f'"{h.hexdigest()}"'
+
+def etag_matches(if_none_match: str, etag: str):
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+class InterviewResponseCache:
+    """
+    Bounded LRU of serialized get_interview responses (ETag, JSON bytes). Only
+    finalized interviews (completed, feedback written) go in, since their
+    payload no longer changes; a repeat view is served without touching the DB.
+    """
+    def __init__(self, max_bytes: int = INTERVIEW_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.items = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, interview_id: str):
+        entry = self.items.get(interview_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.items.move_to_end(interview_id)
+        self.hits += 1
+        return entry
+
+    def put(self, interview_id: str, etag: str, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        self.invalidate(interview_id)
+        self.items[interview_id] = (etag, body)
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self.items.popitem(last=False)
+            self.size -= len(evicted)
+
+    def invalidate(self, interview_id: str, *_):
+        entry = self.items.pop(interview_id, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+    def stats(self):
+        return {"entries": len(self.items), "bytes": self.size, "hits": self.hits, "misses": self.misses}
+
+interview_cache = InterviewResponseCache()
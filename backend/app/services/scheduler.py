@@ -0,0 +1,113 @@
+import heapq
+import asyncio
+import itertools
+
+class Timer:
+    __slots__ = ("when", "callback", "cancelled")
+
+    def __init__(self, when, callback):
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class DeadlineScheduler:
+    """
+    One heap of deadlines shared by every live interview. A single loop callback
+    is armed for the earliest deadline, so idle sessions cost no wakeups at all.
+    Cancelled timers are dropped lazily when they reach the top of the heap.
+    """
+    def __init__(self):
+        self.heap = []
+        self.seq = itertools.count()
+        self.handle = None
+        self.handle_when = None
+        self.cancelled = 0
+
+    def call_at(self, when: float, callback):
+        """Runs callback at loop time `when`; returns a Timer that can be cancelled."""
+        timer = Timer(when, callback)
+        heapq.heappush(self.heap, (when, next(self.seq), timer))
+        if self.handle_when is None or when < self.handle_when:
+            self._arm(when)
+        return timer
+
+    def call_later(self, delay: float, callback):
+        return self.call_at(asyncio.get_running_loop().time() + delay, callback)
+
+    def cancel(self, timer: Timer):
+        if timer and not timer.cancelled:
+            timer.cancel()
+            self.cancelled += 1
+            # Re-armed silence timers cancel constantly; keep the heap from filling with corpses
+            if self.cancelled > 1024 and self.cancelled > len(self.heap) // 2:
+                self.heap = [e for e in self.heap if not e[2].cancelled]
+                heapq.heapify(self.heap)
+                self.cancelled = 0
+
+    def _arm(self, when):
+        if self.handle:
+            self.handle.cancel()
+        self.handle = asyncio.get_running_loop().call_at(when, self._run)
+        self.handle_when = when
+
+    def _run(self):
+        self.handle = None
+        self.handle_when = None
+        now = asyncio.get_running_loop().time()
+        while self.heap and self.heap[0][0] <= now:
+            _, _, timer = heapq.heappop(self.heap)
+            if timer.cancelled:
+                self.cancelled = max(0, self.cancelled - 1)
+                continue
+            timer.cancelled = True
+            try:
+                timer.callback()
+            except Exception as e:
+                print("Timer callback error:", e)
+        while self.heap and self.heap[0][2].cancelled:
+            heapq.heappop(self.heap)
+            self.cancelled = max(0, self.cancelled - 1)
+        if self.heap:
+            self._arm(self.heap[0][0])
+
+deadline_scheduler = DeadlineScheduler()
+
+class SessionTimers:
+    """
+    Named deadlines for one interview (e.g. "silence", "hard_stop"). Re-arming a
+    name replaces its previous deadline; next() waits for whichever fires first.
+    """
+    def __init__(self, scheduler: DeadlineScheduler = deadline_scheduler):
+        self.scheduler = scheduler
+        self.timers = {}
+        self.fired = asyncio.Queue()
+
+    def arm(self, name: str, delay: float):
+        self.disarm(name)
+        timer = None
+        def fire():
+            if self.timers.get(name) is timer:
+                self.fired.put_nowait((name, timer))
+        timer = self.scheduler.call_later(max(0.0, delay), fire)
+        self.timers[name] = timer
+
+    def disarm(self, name: str):
+        self.scheduler.cancel(self.timers.pop(name, None))
+
+    def armed(self, name: str):
+        return name in self.timers
+
+    async def next(self):
+        while True:
+            name, timer = await self.fired.get()
+            # Skip firings that were re-armed or disarmed while queued
+            if self.timers.get(name) is timer:
+                del self.timers[name]
+                return name
+
+    def close(self):
+        for name in list(self.timers):
+            self.disarm(name)
@@ -0,0 +1,94 @@
+import os
+import json
+import asyncio
+from sqlalchemy import update
+from dotenv import load_dotenv
+
+from app.core.database import AsyncSessionLocal
+from app.models import Question
+from app.services.llm import client, llm_slot
+from app.services.capacity import BACKGROUND
+
+load_dotenv()
+
+INCREMENTAL_SCORING = os.getenv("INCREMENTAL_SCORING", "1") == "1"
+SCORING_MODEL = os.getenv("SCORING_MODEL", "llama-3.1-8b-instant")
+SCORING_CONCURRENCY = int(os.getenv("SCORING_CONCURRENCY", "8"))
+SCORING_TIMEOUT_SEC = float(os.getenv("SCORING_TIMEOUT_SEC", "20"))
+
+SCORING_PROMPT = """
+You are an expert technical interviewer grading ONE answer from a {seniority} {topic} interview (difficulty: {difficulty}).
+Return ONLY a JSON object with these keys:
+- technicalScore: technical correctness and depth (1-10)
+- communicationScore: clarity and structure (1-10)
+- englishScore: English grammar and fluency (1-10)
+- note: one short sentence on the main strength or weakness of the answer
+"""
+
+_semaphore = asyncio.Semaphore(SCORING_CONCURRENCY)
+_pending = {}
+
+def _clamp(value):
+    try:
+        return max(1, min(10, int(round(float(value)))))
+    except (TypeError, ValueError):
+        return None
+
+async def score_answer(question_id: str, question: str, answer: str, context: dict, writer=None):
+    async with _semaphore:
+        try:
+            async with llm_slot(BACKGROUND):
+                completion = await asyncio.wait_for(
+                    client.chat.completions.create(
+                        model=SCORING_MODEL,
+                        messages=[
+                            {"role": "system", "content": SCORING_PROMPT.format(**context)},
+                            {"role": "user", "content": f"Question: {question}\nAnswer: {answer}"}
+                        ],
+                        temperature=0.2,
+                        max_completion_tokens=150,
+                        response_format={"type": "json_object"}
+                    ),
+                    timeout=SCORING_TIMEOUT_SEC,
+                )
+            result = json.loads(completion.choices[0].message.content)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Scoring error for question {question_id}: {e}")
+            return
+
+        # The row is written behind the turn; make sure it exists before updating it
+        if writer is not None:
+            await writer.flush()
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Question)
+                .where(Question.id == question_id)
+                .values(
+                    technicalScore=_clamp(result.get("technicalScore")),
+                    communicationScore=_clamp(result.get("communicationScore")),
+                    englishScore=_clamp(result.get("englishScore")),
+                    evaluation=str(result.get("note") or "")[:500] or None,
+                )
+            )
+            await db.commit()
+
+def schedule_scoring(interview_id: str, question_id: str, question: str, answer: str, context: dict, writer=None):
+    """Scores one answer in the background while the interview carries on."""
+    if not INCREMENTAL_SCORING or not question_id or not question or not answer:
+        return
+    task = asyncio.create_task(score_answer(question_id, question, answer, context, writer))
+    tasks = _pending.setdefault(interview_id, set())
+    tasks.add(task)
+
+    def _done(t):
+        tasks.discard(t)
+        if not tasks and _pending.get(interview_id) is tasks:
+            del _pending[interview_id]
+    task.add_done_callback(_done)
+
+async def wait_for_scoring(interview_id: str, timeout: float = SCORING_TIMEOUT_SEC):
+    tasks = list(_pending.get(interview_id, ()))
+    if tasks:
+        await asyncio.wait(tasks, timeout=timeout)
@@ -1,23 +1,210 @@
-import uuid
+import os
+import abc
+import json
+import time
+import contextvars
+from dotenv import load_dotenv
 
+load_dotenv()
+
+# "memory" keeps sessions in this process; "redis" shares them between workers
+SESSION_STORE = os.getenv("SESSION_STORE", "memory")
+SESSION_REDIS_URL = os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0")
+SESSION_TTL_SEC = int(os.getenv("SESSION_TTL_SEC", "7200"))
+# A live connection refreshes its liveness mark every third of this; a crashed one's lapses
+SESSION_LIVE_TTL_SEC = int(os.getenv("SESSION_LIVE_TTL_SEC", "30"))
+
+# Live sessions handled by this worker: runtime objects (tasks, history, speculation)
 SESSIONS = {}
 
-def create_session():
-    sid = str(uuid.uuid4())
-    SESSIONS[sid] = {
-        "history": [],
-        "buffer": [],
-        "last_voice_ts": None,
-        "processing_ai": False,
-        "ai_end_ts": None,
-        "reading_time": 0,
-        "tts_task": None
+# Interview the running code belongs to; tasks inherit it from whoever created them
+current_session = contextvars.ContextVar("current_session", default=None)
+
+# Fields of a live session that are worth restoring on another worker
+STATE_FIELDS = ("buffer", "ai_end_ts", "reading_time")
+
+def session_state(session: dict):
+    """Compact, JSON-serializable snapshot of a live session (history is checkpointed separately)."""
+    return {
+        **{k: session.get(k) for k in STATE_FIELDS},
+        "pid": os.getpid(),
+        "updated_at": time.time(),
     }
-    return sid
 
-def get_session(sid):
-    return SESSIONS.get(sid)
+class SessionStore(abc.ABC):
+    """
+    Serializable interview state shared by every worker. Small fields are saved
+    as one JSON blob; history is append-only turns plus a summary, so a
+    checkpoint only ships what changed since the last one.
+
+    Separately, the connection serving an interview holds a short-lived
+    liveness mark (its token), so any worker can tell whether someone is
+    still connected and a newer connection can take over from an older one.
+    """
+    @abc.abstractmethod
+    async def load(self, sid: str):
+        """Returns {"state", "summary", "turns"} or None."""
+
+    @abc.abstractmethod
+    async def save(self, sid: str, state: dict):
+        """Replaces the small-field state blob."""
+
+    @abc.abstractmethod
+    async def append_turns(self, sid: str, turns: list):
+        """Adds history turns recorded since the last checkpoint."""
+
+    @abc.abstractmethod
+    async def set_summary(self, sid: str, summary: str, drop: int):
+        """Stores a new summary and drops the first `drop` stored turns it replaced."""
+
+    @abc.abstractmethod
+    async def delete(self, sid: str):
+        """Drops everything stored for the interview."""
+
+    @abc.abstractmethod
+    async def claim(self, sid: str, token: str):
+        """Marks the connection with this token as the live one, replacing any other."""
+
+    @abc.abstractmethod
+    async def owner(self, sid: str):
+        """Token of the live connection, or None once its mark has lapsed."""
+
+    @abc.abstractmethod
+    async def release(self, sid: str, token: str):
+        """Clears the liveness mark if this token still holds it."""
+
+    async def refresh(self, sid: str, token: str):
+        """Heartbeat: extends the mark; False once another connection has claimed the interview."""
+        if await self.owner(sid) not in (None, token):
+            return False
+        await self.claim(sid, token)
+        return True
+
+    async def close(self):
+        pass
+
+class InMemorySessionStore(SessionStore):
+    """Single-worker store; entries are kept serialized so both stores behave alike."""
+    def __init__(self):
+        self.entries = {}
+        self.owners = {}  # sid -> (token, expires at)
+
+    def _entry(self, sid):
+        return self.entries.setdefault(sid, {"state": "{}", "summary": "", "turns": []})
+
+    async def load(self, sid):
+        entry = self.entries.get(sid)
+        if entry is None:
+            return None
+        return {
+            "state": json.loads(entry["state"]),
+            "summary": entry["summary"],
+            "turns": [json.loads(t) for t in entry["turns"]],
+        }
+
+    async def save(self, sid, state):
+        self._entry(sid)["state"] = json.dumps(state)
+
+    async def append_turns(self, sid, turns):
+        self._entry(sid)["turns"].extend(json.dumps(t) for t in turns)
+
+    async def set_summary(self, sid, summary, drop):
+        entry = self._entry(sid)
+        entry["summary"] = summary
+        del entry["turns"][:drop]
+
+    async def delete(self, sid):
+        self.entries.pop(sid, None)
+
+    async def claim(self, sid, token):
+        self.owners[sid] = (token, time.monotonic() + SESSION_LIVE_TTL_SEC)
+
+    async def owner(self, sid):
+        entry = self.owners.get(sid)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        self.owners.pop(sid, None)
+        return None
+
+    async def release(self, sid, token):
+        if await self.owner(sid) == token:
+            del self.owners[sid]
+
+class RedisSessionStore(SessionStore):
+    """
+    Networked store for running several workers. Works against any
+    Redis-compatible server; every key expires SESSION_TTL_SEC after the last write.
+    """
+    def __init__(self, url: str = SESSION_REDIS_URL, ttl: int = SESSION_TTL_SEC):
+        import redis.asyncio as redis
+        self.redis = redis.from_url(url, decode_responses=True)
+        self.ttl = ttl
+
+    def _keys(self, sid):
+        return f"interview:session:{sid}", f"interview:session:{sid}:turns"
+
+    async def load(self, sid):
+        key, turns_key = self._keys(sid)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(key)
+            pipe.lrange(turns_key, 0, -1)
+            entry, turns = await pipe.execute()
+        if not entry:
+            return None
+        return {
+            "state": json.loads(entry.get("state") or "{}"),
+            "summary": entry.get("summary", ""),
+            "turns": [json.loads(t) for t in turns],
+        }
+
+    async def save(self, sid, state):
+        key, turns_key = self._keys(sid)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, "state", json.dumps(state))
+            pipe.expire(key, self.ttl)
+            pipe.expire(turns_key, self.ttl)
+            await pipe.execute()
+
+    async def append_turns(self, sid, turns):
+        if not turns:
+            return
+        key, turns_key = self._keys(sid)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(turns_key, *[json.dumps(t) for t in turns])
+            pipe.expire(turns_key, self.ttl)
+            await pipe.execute()
+
+    async def set_summary(self, sid, summary, drop):
+        key, turns_key = self._keys(sid)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, "summary", summary)
+            if drop:
+                pipe.ltrim(turns_key, drop, -1)
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def delete(self, sid):
+        await self.redis.delete(*self._keys(sid))
+
+    def _live_key(self, sid):
+        return f"interview:session:{sid}:live"
+
+    async def claim(self, sid, token):
+        await self.redis.set(self._live_key(sid), token, ex=SESSION_LIVE_TTL_SEC)
+
+    async def owner(self, sid):
+        return await self.redis.get(self._live_key(sid))
+
+    async def release(self, sid, token):
+        if await self.owner(sid) == token:
+            await self.redis.delete(self._live_key(sid))
+
+    async def close(self):
+        await self.redis.aclose()
+
+def create_session_store(kind: str = SESSION_STORE):
+    if kind == "redis":
+        return RedisSessionStore()
+    return InMemorySessionStore()
 
-def delete_session(sid):
-    if sid in SESSIONS:
-        del SESSIONS[sid]
+session_store = create_session_store()
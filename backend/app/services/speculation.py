@@ -0,0 +1,88 @@
+import os
+import asyncio
+from dotenv import load_dotenv
+
+from app.services.llm import stream_llm
+
+load_dotenv()
+
+SPECULATIVE_LLM = os.getenv("SPECULATIVE_LLM", "1") == "1"
+
+class SpeculationStats:
+    """
+    Process-wide counters for tuning speculative generation. Stream chunks are
+    counted as tokens (Groq sends roughly one token per chunk).
+    """
+    def __init__(self):
+        self.started = 0
+        self.hits = 0
+        self.discarded = 0
+        self.used_tokens = 0
+        self.wasted_tokens = 0
+
+    def stats(self):
+        finished = self.hits + self.discarded
+        return {
+            "started": self.started,
+            "hits": self.hits,
+            "discarded": self.discarded,
+            "hit_rate": round(self.hits / finished, 3) if finished else 0.0,
+            "used_tokens": self.used_tokens,
+            "wasted_tokens": self.wasted_tokens,
+        }
+
+speculation_stats = SpeculationStats()
+
+class SpeculativeReply:
+    """
+    An LLM reply started on AssemblyAI's end_of_turn, before the silence window
+    has confirmed the candidate is done. The deltas are buffered; if the turn is
+    committed unchanged, stream() replays them and continues with the live tail.
+    """
+    def __init__(self, key, messages):
+        self.key = key
+        self.messages = messages
+        self.usage = {}
+        self.deltas = []
+        self.done = False
+        self.error = None
+        self.updated = asyncio.Event()
+        self.task = asyncio.create_task(self._run(messages))
+        speculation_stats.started += 1
+
+    async def _run(self, messages):
+        try:
+            async for delta in stream_llm(messages, usage=self.usage):
+                self.deltas.append(delta)
+                self.updated.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self.updated.set()
+
+    def matches(self, key):
+        return self.key == key
+
+    async def stream(self):
+        speculation_stats.hits += 1
+        i = 0
+        while True:
+            while i < len(self.deltas):
+                yield self.deltas[i]
+                i += 1
+            if self.done:
+                break
+            self.updated.clear()
+            await self.updated.wait()
+        speculation_stats.used_tokens += i
+        if self.error and not i:
+            raise self.error
+
+    def discard(self):
+        if not self.task.done():
+            self.task.cancel()
+        speculation_stats.discarded += 1
+        speculation_stats.wasted_tokens += len(self.deltas)
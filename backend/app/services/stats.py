@@ -0,0 +1,143 @@
+"""
+Per-user progress rollups (UserStats), kept up to date as feedback is written.
+Feedback from before the rollups existed is folded in once, after deploying:
+
+    cd backend
+    python -m app.services.stats --backfill
+"""
+import sys
+import json
+import asyncio
+import argparse
+from datetime import datetime, timezone
+from sqlalchemy import select, delete
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models import Interview, Feedback, UserStats, generate_cuid
+
+STATS_RECENT = 10  # ratings kept per row for the trend
+
+OVERALL = ("", "")
+
+def _insert_ignore(dialect: str):
+    # Creates the row if it's missing without failing (and rolling back) on a concurrent insert
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert(UserStats).on_conflict_do_nothing(index_elements=["userId", "topic", "difficulty"])
+
+def _empty(user_id: str, topic: str, difficulty: str):
+    return UserStats(userId=user_id, topic=topic, difficulty=difficulty, interviews=0, ratingSum=0,
+                     technicalSum=0, technicalCount=0, englishSum=0, englishCount=0,
+                     communicationSum=0, communicationCount=0, recentRatings="[]")
+
+def is_rated(feedback: Feedback):
+    # Rating 0 marks a placeholder (failed or empty analysis); it never counts toward progress
+    return (feedback.rating or 0) > 0
+
+def apply_feedback(row: UserStats, feedback: Feedback, at: datetime):
+    row.interviews += 1
+    row.ratingSum += feedback.rating or 0
+    for name in ("technical", "english", "communication"):
+        score = getattr(feedback, f"{name}Score")
+        if score is not None:
+            setattr(row, f"{name}Sum", getattr(row, f"{name}Sum") + score)
+            setattr(row, f"{name}Count", getattr(row, f"{name}Count") + 1)
+    recent = json.loads(row.recentRatings or "[]") + [feedback.rating]
+    row.recentRatings = json.dumps(recent[-STATS_RECENT:])
+    row.lastFeedbackAt = at
+
+async def _locked_row(db, user_id: str, topic: str, difficulty: str):
+    stmt = _insert_ignore(db.get_bind().dialect.name)
+    if stmt is not None:
+        await db.execute(stmt.values(id=generate_cuid(), userId=user_id, topic=topic, difficulty=difficulty))
+    row = (await db.execute(
+        select(UserStats)
+        .where(UserStats.userId == user_id, UserStats.topic == topic, UserStats.difficulty == difficulty)
+        .with_for_update()
+    )).scalars().first()
+    if row is None:
+        row = _empty(user_id, topic, difficulty)
+        db.add(row)
+    return row
+
+async def record_feedback(db, interview: Interview, feedback: Feedback):
+    """
+    Folds one Feedback row into the user's overall and (topic, difficulty) rollups.
+    Call inside the transaction that inserts the feedback, so both commit together.
+    """
+    if not is_rated(feedback):
+        return
+    now = datetime.now(timezone.utc)
+    for topic, difficulty in (OVERALL, (interview.topic, interview.difficulty)):
+        row = await _locked_row(db, interview.userId, topic, difficulty)
+        apply_feedback(row, feedback, now)
+
+async def rebuild_user_stats(db, user_id: str):
+    """Recomputes a user's rollups from their Feedback rows, by the same is_rated rule."""
+    await db.execute(delete(UserStats).where(UserStats.userId == user_id))
+    rows = {}
+    result = await db.stream(
+        select(Interview.topic, Interview.difficulty, Feedback)
+        .join(Feedback, Feedback.interviewId == Interview.id)
+        .where(Interview.userId == user_id, Feedback.rating > 0)  # is_rated, in SQL
+        .order_by(Feedback.createdAt)
+    )
+    async for topic, difficulty, feedback in result:
+        for key in (OVERALL, (topic, difficulty)):
+            if key not in rows:
+                rows[key] = _empty(user_id, *key)
+            apply_feedback(rows[key], feedback, feedback.createdAt)
+    db.add_all(rows.values())
+    return list(rows.values())
+
+def _avg(total: int, count: int):
+    return round(total / count, 2) if count else None
+
+def summarize(row: UserStats):
+    recent = json.loads(row.recentRatings or "[]")
+    half = len(recent) // 2
+    # Trend: latest half of the recent ratings against the half before it
+    trend = round(sum(recent[half:]) / (len(recent) - half) - sum(recent[:half]) / half, 2) if half else None
+    return {
+        "topic": row.topic or None,
+        "difficulty": row.difficulty or None,
+        "interviews": row.interviews,
+        "avgRating": _avg(row.ratingSum, row.interviews),
+        "avgTechnical": _avg(row.technicalSum, row.technicalCount),
+        "avgEnglish": _avg(row.englishSum, row.englishCount),
+        "avgCommunication": _avg(row.communicationSum, row.communicationCount),
+        "recentRatings": recent,
+        "trend": trend,
+        "lastFeedbackAt": row.lastFeedbackAt,
+    }
+
+async def backfill():
+    """Rebuilds the rollups of every user with feedback, one transaction per user. Safe to rerun."""
+    async with AsyncSessionLocal() as db:
+        user_ids = (await db.execute(
+            select(Interview.userId).join(Feedback, Feedback.interviewId == Interview.id).distinct()
+        )).scalars().all()
+    for user_id in user_ids:
+        async with AsyncSessionLocal() as db:
+            await rebuild_user_stats(db, user_id)
+            await db.commit()
+    return len(user_ids)
+
+async def main(args):
+    try:
+        count = await backfill()
+    finally:
+        await engine.dispose()
+    print(f"Rebuilt stats for {count} user(s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain per-user progress rollups.")
+    parser.add_argument("--backfill", action="store_true", help="rebuild every user's rollups from their feedback")
+    args = parser.parse_args()
+    if not args.backfill:
+        parser.error("nothing to do (use --backfill)")
+    asyncio.run(main(args))
@@ -0,0 +1,138 @@
+import asyncio
+from datetime import datetime, timezone
+from sqlalchemy import update
+
+from app.core.database import AsyncSessionLocal
+from app.models import Interview, Question, generate_cuid
+
+WRITE_RETRIES = 5
+
+_writers = set()
+
+class TranscriptWriter:
+    """
+    Write-behind persistence for one interview. The current Question id lives in
+    memory, so a turn never has to look it up; everything queued since the last
+    flush (answer update, next question, completion) goes out in one transaction
+    off the hot path.
+    """
+    def __init__(self, interview_id: str, current_question_id=None, current_answer=None, current_question=None):
+        self.interview_id = interview_id
+        self.current_question_id = current_question_id
+        self.current_answer = current_answer
+        self.current_question = current_question
+        self.new_questions = []
+        self.answers = {}
+        self.complete_at = None
+        self.completed = False
+        self.wakeup = asyncio.Event()
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.closed = False
+        self.task = asyncio.create_task(self._run())
+        _writers.add(self)
+
+    def set_answer(self, text: str, append: bool = False):
+        if not self.current_question_id or not text:
+            return
+        if append and self.current_answer:
+            text = self.current_answer + " " + text
+        self.current_answer = text
+        self.answers[self.current_question_id] = text
+        # No wakeup: the answer rides in the next question's (or completion's) transaction
+        self.idle.clear()
+
+    def add_question(self, text: str):
+        qid = generate_cuid()
+        # Explicit timestamps: several inserts can share one transaction (and now())
+        self.new_questions.append(Question(
+            id=qid,
+            interviewId=self.interview_id,
+            question=text,
+            createdAt=datetime.now(timezone.utc),
+        ))
+        self.current_question_id = qid
+        self.current_question = text
+        self.current_answer = None
+        self._kick()
+        return qid
+
+    def complete(self):
+        if not self.completed:
+            self.completed = True
+            self.complete_at = datetime.now(timezone.utc)
+            self._kick()
+
+    def _kick(self):
+        self.idle.clear()
+        self.wakeup.set()
+
+    async def _write(self, questions, answers, complete_at):
+        async with AsyncSessionLocal() as db:
+            db.add_all(questions)
+            await db.flush()
+            for qid, text in answers.items():
+                await db.execute(update(Question).where(Question.id == qid).values(userAnswer=text))
+            if complete_at:
+                await db.execute(
+                    update(Interview)
+                    .where(Interview.id == self.interview_id)
+                    .values(status="COMPLETED", endTime=complete_at)
+                )
+            await db.commit()
+
+    async def _run(self):
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+
+            questions, self.new_questions = self.new_questions, []
+            answers, self.answers = self.answers, {}
+            complete_at, self.complete_at = self.complete_at, None
+
+            if questions or answers or complete_at:
+                for attempt in range(WRITE_RETRIES):
+                    try:
+                        await self._write(questions, answers, complete_at)
+                        break
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        print(f"Transcript write failed for {self.interview_id} (attempt {attempt + 1}): {e}")
+                        # Fresh ORM objects for the retry; the failed session may have touched them
+                        questions = [Question(id=q.id, interviewId=q.interviewId, question=q.question,
+                                              createdAt=q.createdAt) for q in questions]
+                        await asyncio.sleep(min(2 ** attempt * 0.2, 5))
+
+            if self.wakeup.is_set():
+                continue
+            if self.new_questions or self.answers or self.complete_at:
+                # An answer set during the write waits for its question, unless we're closing
+                if self.closed:
+                    self.wakeup.set()
+                continue
+            self.idle.set()
+            if self.closed:
+                return
+
+    async def flush(self):
+        """Writes out everything queued so far and waits until it is committed."""
+        if not self.idle.is_set():
+            self.wakeup.set()
+        await self.idle.wait()
+
+    async def drain(self):
+        """Final flush on disconnect; the writer is unusable afterwards."""
+        self.closed = True
+        self.wakeup.set()
+        try:
+            await self.task
+        finally:
+            _writers.discard(self)
+
+async def drain_all_writers():
+    for writer in list(_writers):
+        try:
+            await writer.drain()
+        except Exception as e:
+            print(f"Transcript drain failed for {writer.interview_id}: {e}")
@@ -1,83 +1,338 @@
 import os
-import json
+import re
 import uuid
 import time
 import asyncio
 import base64
-import wave
-import io
-import websockets
 from dotenv import load_dotenv
 
+from app.services.tts_pool import tts_pool, next_message, ConnectionLost
+from app.services.tts_cache import tts_cache, pending_audio, cache_key
+from app.services.prompts import FIXED_UTTERANCES, build_first_question
+from app.services.audio_framing import wav_to_pcm
+
 load_dotenv()
 
 INWORLD_API_KEY = os.getenv("INWORLD_API_KEY")
 INWORLD_VOICE_ID = os.getenv("INWORLD_VOICE_ID", "Ashley")
 INWORLD_MODEL_ID = "inworld-tts-1.5-max"
 INWORLD_SAMPLE_RATE = 24000
+TTS_MAX_RETRIES = int(os.getenv("TTS_MAX_RETRIES", "1"))
+# Longest wait for Inworld's contextClosed once an utterance's text is all sent
+TTS_CLOSE_TIMEOUT_SEC = float(os.getenv("TTS_CLOSE_TIMEOUT_SEC", "30"))
+TTS_CACHE_CHUNK_MS = int(os.getenv("TTS_CACHE_CHUNK_MS", "250"))
+TTS_PREWARM_TOPICS = [t.strip() for t in os.getenv("TTS_PREWARM_TOPICS", "").split(",") if t.strip()]
+
+# Sentence chunking for streamed LLM output
+TTS_MIN_CHUNK_CHARS = int(os.getenv("TTS_MIN_CHUNK_CHARS", "12"))
+TTS_MAX_CHUNK_CHARS = int(os.getenv("TTS_MAX_CHUNK_CHARS", "220"))
 
-def pcm_to_wav(pcm: bytes, rate: int):
-    buf = io.BytesIO()
-    with wave.open(buf, "wb") as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(rate)
-        wf.writeframes(pcm)
-    return buf.getvalue()
+_SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*\s+|\n+")
 
-async def stream_inworld_tts_to_client(text: str, ws):
+class SentenceChunker:
     """
-    Connects to Inworld and streams audio back as binary chunks to the client WebSocket.
+    Accumulates streamed LLM text and hands back complete sentences as soon as
+    they are available, so TTS can start on the first one while the rest is
+    still being generated.
     """
-    if not INWORLD_API_KEY:
-        print("Error: INWORLD_API_KEY not set")
-        return
+    def __init__(self, min_chars: int = TTS_MIN_CHUNK_CHARS, max_chars: int = TTS_MAX_CHUNK_CHARS):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.buf = ""
+
+    def feed(self, delta: str):
+        self.buf += delta
+        out = []
+        start = 0
+        for m in _SENTENCE_END.finditer(self.buf):
+            if m.end() - start < self.min_chars:
+                continue
+            sentence = self.buf[start:m.end()].strip()
+            if sentence:
+                out.append(sentence)
+            start = m.end()
+        self.buf = self.buf[start:]
+
+        # Run-on text with no punctuation: break at the last space rather than wait
+        if len(self.buf) > self.max_chars:
+            cut = self.buf.rfind(" ", 0, self.max_chars)
+            if cut <= 0:
+                cut = self.max_chars
+            out.append(self.buf[:cut].strip())
+            self.buf = self.buf[cut:]
+        return out
+
+    def flush(self):
+        rest = self.buf.strip()
+        self.buf = ""
+        return rest
+
+class Playback:
+    """
+    One utterance on its way to the client. cancel() takes effect before the
+    next frame: nothing more is sent, the Inworld context is closed by the
+    task's cleanup and the pooled connection stays open for the next reply.
+    """
+    def __init__(self, out, trace=None):
+        self.out = out
+        self.trace = trace
+        self.task = None
+        self.cancelled = False
+        self.utterance_id = None
+        self.seq = 0
+        self.sent_bytes = 0
+        self.first_sent_ts = None
 
-    headers = {"Authorization": f"Basic {INWORLD_API_KEY}"}
-    url = "wss://api.inworld.ai/tts/v1/voice:streamBidirectional"
-    context_id = f"ctx-{int(time.time()*1000)}-{uuid.uuid4().hex[:6]}"
-
-    async with websockets.connect(url, extra_headers=headers) as tts_ws:
-        await tts_ws.send(json.dumps({
-            "context_id": context_id,
-            "create": {
-                "voice_id": INWORLD_VOICE_ID,
-                "model_id": INWORLD_MODEL_ID,
-                "audio_config": {
-                    "audio_encoding": "LINEAR16",
-                    "sample_rate_hertz": INWORLD_SAMPLE_RATE
-                }
+    def start_utterance(self):
+        self.utterance_id = self.out.next_utterance()
+        self.seq = 0
+        return self.utterance_id
+
+    async def send(self, pcm: bytes):
+        if self.cancelled:
+            return
+        if self.utterance_id is None:
+            self.start_utterance()
+        if self.first_sent_ts is None:
+            self.first_sent_ts = time.time()
+            if self.trace is not None:
+                self.trace.mark("client_first_byte")
+        self.sent_bytes += len(pcm)
+        seq = self.seq
+        self.seq += 1
+        await self.out.send(pcm, self.utterance_id, seq)
+
+    def done(self):
+        return self.task is None or self.task.done()
+
+    def played_ms(self, now: float = None):
+        """Audio the client has played so far: what was sent, capped by real time since the first frame."""
+        if self.first_sent_ts is None:
+            return 0
+        sent_ms = self.sent_bytes * 1000 / (self.out.sample_rate * 2)
+        return int(min(sent_ms, ((now or time.time()) - self.first_sent_ts) * 1000))
+
+    def cancel(self):
+        self.cancelled = True
+        if self.task and not self.task.done():
+            self.task.cancel()
+        return self.played_ms()
+
+class TTSStream:
+    """
+    One Inworld context for one AI utterance, opened on a pooled connection.
+    Text can be pushed sentence by sentence while audio for earlier sentences is
+    already streaming back to the client (an AudioOutput, or None to only record).
+    """
+    def __init__(self, out, record: bool = False):
+        self.out = out
+        self.trace = getattr(out, "trace", None)
+        self.pcm = bytearray() if record else None
+        self.audio_started = False
+        self.context_id = f"ctx-{int(time.time()*1000)}-{uuid.uuid4().hex[:6]}"
+        self.conn = None
+        self.queue = None
+        self.reader = None
+        self.texts = []
+        self.finishing = False
+        self.context_closed = False
+        self.error = None
+        self.retries = TTS_MAX_RETRIES
+        self.lock = asyncio.Lock()
+
+    @staticmethod
+    def create_config():
+        return {
+            "voice_id": INWORLD_VOICE_ID,
+            "model_id": INWORLD_MODEL_ID,
+            "audio_config": {
+                "audio_encoding": "LINEAR16",
+                "sample_rate_hertz": INWORLD_SAMPLE_RATE
             }
-        }))
+        }
+
+    async def open(self):
+        if self.out is not None:
+            self.out.start_utterance()
+        self.conn, self.queue = await tts_pool.open_context(self.context_id, self.create_config())
+        self.reader = asyncio.create_task(self._forward_audio())
 
-        await tts_ws.send(json.dumps({
-            "context_id": context_id,
-            "send_text": {"text": text, "flush_context": {}}
-        }))
+    async def send_text(self, text: str):
+        if not text:
+            return
+        conn = self.conn
+        self.texts.append(text)
+        try:
+            await conn.send({
+                "context_id": self.context_id,
+                "send_text": {"text": text, "flush_context": {}}
+            })
+        except ConnectionLost:
+            await self._recover(conn)
 
-        await tts_ws.send(json.dumps({
-            "context_id": context_id,
-            "close_context": {}
-        }))
+    def complete(self):
+        """True once Inworld closed the context without an error: the audio is the whole utterance."""
+        return self.context_closed and self.error is None
 
-        sent_meta = False
+    async def finish(self, timeout: float = TTS_CLOSE_TIMEOUT_SEC):
+        """Closes the context and waits until all of its audio has been forwarded (see complete())."""
+        conn = self.conn
+        self.finishing = True
+        try:
+            await conn.send({"context_id": self.context_id, "close_context": {}})
+        except ConnectionLost:
+            await self._recover(conn)
+        try:
+            await asyncio.wait_for(self.reader, timeout)
+        except asyncio.TimeoutError:
+            # contextClosed was lost: stop waiting, aclose() hands the slot back to the pool
+            print(f"Inworld context {self.context_id} not closed after {timeout}s, releasing it")
 
-        async for msg in tts_ws:
+    async def aclose(self):
+        if self.reader and not self.reader.done():
+            self.reader.cancel()
+        if self.conn:
+            if not self.context_closed:
+                try:
+                    await self.conn.send({"context_id": self.context_id, "close_context": {}})
+                except ConnectionLost:
+                    pass
+            await tts_pool.release(self.conn, self.context_id)
+
+    async def _recover(self, failed_conn):
+        # A dropped socket before any audio reached the client is invisible to the
+        # candidate: reopen the context elsewhere and replay the text sent so far.
+        async with self.lock:
+            if self.conn is not failed_conn:
+                return
+            if self.audio_started or self.retries <= 0:
+                raise ConnectionLost("Inworld connection dropped mid-utterance")
+            self.retries -= 1
+            await tts_pool.release(failed_conn, self.context_id)
+            self.conn, self.queue = await tts_pool.open_context(self.context_id, self.create_config())
+            for text in self.texts:
+                await self.conn.send({
+                    "context_id": self.context_id,
+                    "send_text": {"text": text, "flush_context": {}}
+                })
+            if self.finishing:
+                await self.conn.send({"context_id": self.context_id, "close_context": {}})
+
+    async def _forward_audio(self):
+        while True:
+            conn = self.conn
             try:
-                data = json.loads(msg)
-            except Exception:
+                data = await next_message(self.queue)
+            except ConnectionLost:
+                await self._recover(conn)
                 continue
 
+            if data.get("error"):
+                self.error = data["error"]
+                print("Inworld context error:", data["error"])
+
             chunk = data.get("result", {}).get("audioChunk", {}).get("audioContent")
             if chunk:
                 raw = base64.b64decode(chunk)
-                audio = raw if raw[:4] == b"RIFF" else pcm_to_wav(raw, INWORLD_SAMPLE_RATE)
+                pcm = wav_to_pcm(raw) if raw[:4] == b"RIFF" else raw
+                self.audio_started = True
+                if self.trace is not None:
+                    self.trace.mark_once("tts_first_byte")
+                    self.trace.mark("tts_last_byte")
+                if self.pcm is not None:
+                    self.pcm += pcm
+                if self.out is not None:
+                    await self.out.send(pcm)
 
-                if not sent_meta:
-                    await ws.send_json({"type": "audio_meta", "mime": "audio/wav"})
-                    sent_meta = True
+            if "contextClosed" in data.get("result", {}):
+                self.context_closed = True
+                break
 
-                await ws.send_bytes(audio)
+async def stream_sentences_to_client(sentences: asyncio.Queue, out, record: bool = False):
+    """
+    Speaks sentences from the queue as they arrive; a None item ends the utterance.
+    With record=True the synthesized PCM is returned as well, but only when the
+    stream completed: clipped audio must never be cached or replayed.
+    """
+    if not INWORLD_API_KEY:
+        print("Error: INWORLD_API_KEY not set")
+        return None
 
-            if data.get("result", {}).get("contextClosed"):
+    stream = TTSStream(out, record=record)
+    try:
+        await stream.open()
+        while True:
+            sentence = await sentences.get()
+            if sentence is None:
                 break
+            await stream.send_text(sentence)
+        await stream.finish()
+    finally:
+        await stream.aclose()
+    if not record:
+        return None
+    if not stream.complete():
+        print(f"Inworld context {stream.context_id} incomplete, not keeping its audio")
+        return None
+    return bytes(stream.pcm)
+
+async def stream_inworld_tts_to_client(text: str, out, record: bool = False):
+    """
+    Connects to Inworld and streams audio back to the client's AudioOutput.
+    """
+    sentences = asyncio.Queue()
+    sentences.put_nowait(text)
+    sentences.put_nowait(None)
+    return await stream_sentences_to_client(sentences, out, record=record)
+
+def utterance_key(text: str):
+    return cache_key(text, INWORLD_VOICE_ID, INWORLD_MODEL_ID, INWORLD_SAMPLE_RATE)
+
+async def send_pcm(pcm: bytes, out):
+    step = INWORLD_SAMPLE_RATE * 2 * TTS_CACHE_CHUNK_MS // 1000
+    out.start_utterance()
+    for i in range(0, len(pcm), step):
+        await out.send(pcm[i:i + step])
+
+async def speak_text(text: str, out):
+    """
+    Speaks a complete utterance, serving it from the TTS cache when possible.
+    Misses are synthesized live and stored once the full utterance has played.
+    """
+    key = utterance_key(text)
+    pcm = await tts_cache.get(key)
+    if pcm is not None:
+        await send_pcm(pcm, out)
+        return
+
+    pcm = await stream_inworld_tts_to_client(text, out, record=True)
+    await tts_cache.put(key, pcm)
+
+async def speak_pending(interview_id: str, text: str, out):
+    """Re-asks the question an interview is waiting on; its audio never enters the TTS cache."""
+    pcm = pending_audio.get(interview_id, text)
+    if pcm is not None:
+        await send_pcm(pcm, out)
+        return
+
+    pcm = await stream_inworld_tts_to_client(text, out, record=True)
+    pending_audio.put(interview_id, text, pcm)
+
+async def synthesize(text: str):
+    """Synthesizes text into the cache without a client attached."""
+    key = utterance_key(text)
+    if await tts_cache.get(key) is not None:
+        return
+    pcm = await stream_inworld_tts_to_client(text, None, record=True)
+    await tts_cache.put(key, pcm)
+
+async def prewarm_tts_cache(topics=TTS_PREWARM_TOPICS):
+    if not INWORLD_API_KEY:
+        return
+    texts = FIXED_UTTERANCES + [build_first_question(topic) for topic in topics]
+    for text in texts:
+        try:
+            await synthesize(text)
+        except Exception as e:
+            print(f"TTS prewarm failed for {text[:40]!r}: {e}")
+    print(f"TTS cache prewarmed: {tts_cache.stats()}")
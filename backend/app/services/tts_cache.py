@@ -0,0 +1,136 @@
+import os
+import json
+import asyncio
+import time
+import hashlib
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", ".cache/tts")  # empty disables the disk tier
+# Audio of the question each interview is waiting on, replayed on reconnect
+PENDING_AUDIO_MAX_BYTES = int(os.getenv("PENDING_AUDIO_MAX_BYTES", str(16 * 1024 * 1024)))
+PENDING_AUDIO_TTL_SEC = float(os.getenv("PENDING_AUDIO_TTL_SEC", os.getenv("RECONNECT_GRACE_SEC", "120")))
+
+def cache_key(text: str, voice_id: str, model_id: str, sample_rate: int):
+    raw = json.dumps([text.strip(), voice_id, model_id, sample_rate], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class TTSCache:
+    """
+    Content-addressed store of synthesized PCM. A bounded in-memory LRU sits in
+    front of a directory of <sha256>.pcm files that survives restarts.
+    """
+    def __init__(self, max_bytes: int = TTS_CACHE_MAX_BYTES, directory: str = TTS_CACHE_DIR):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.items = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pcm")
+
+    def _remember(self, key, pcm):
+        if len(pcm) > self.max_bytes:
+            return
+        old = self.items.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self.items[key] = pcm
+        self.size += len(pcm)
+        while self.size > self.max_bytes:
+            _, evicted = self.items.popitem(last=False)
+            self.size -= len(evicted)
+
+    def _read_file(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_file(self, key, pcm):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path(key) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(pcm)
+        os.replace(tmp, self._path(key))
+
+    async def get(self, key):
+        pcm = self.items.get(key)
+        if pcm is not None:
+            self.items.move_to_end(key)
+            self.hits += 1
+            return pcm
+        if self.directory:
+            pcm = await asyncio.to_thread(self._read_file, key)
+            if pcm:
+                self._remember(key, pcm)
+                self.hits += 1
+                return pcm
+        self.misses += 1
+        return None
+
+    async def put(self, key, pcm: bytes):
+        if not pcm:
+            return
+        self._remember(key, pcm)
+        if self.directory:
+            try:
+                await asyncio.to_thread(self._write_file, key, pcm)
+            except OSError as e:
+                print("TTS cache write failed:", e)
+
+    def stats(self):
+        return {"entries": len(self.items), "bytes": self.size, "hits": self.hits, "misses": self.misses}
+
+class PendingAudio:
+    """
+    Memory-only audio of the question each interview is waiting on, so a
+    reconnect can re-ask it without synthesizing again. One entry per interview,
+    dropped once the question is answered; entries also expire after the TTL
+    and the oldest go first when the byte budget is exceeded.
+    """
+    def __init__(self, max_bytes: int = PENDING_AUDIO_MAX_BYTES, ttl: float = PENDING_AUDIO_TTL_SEC):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.items = OrderedDict()  # interview_id -> (text, pcm, expires_at), oldest first
+        self.size = 0
+
+    def _expire(self):
+        now = time.monotonic()
+        while self.items:
+            interview_id, (_, pcm, expires_at) = next(iter(self.items.items()))
+            if expires_at > now and self.size <= self.max_bytes:
+                break
+            self.drop(interview_id)
+
+    def put(self, interview_id: str, text: str, pcm: bytes):
+        self.drop(interview_id)
+        if not pcm or len(pcm) > self.max_bytes:
+            return
+        self.items[interview_id] = (text, pcm, time.monotonic() + self.ttl)
+        self.size += len(pcm)
+        self._expire()
+
+    def get(self, interview_id: str, text: str):
+        self._expire()
+        entry = self.items.get(interview_id)
+        if entry is None or entry[0] != text:
+            return None
+        return entry[1]
+
+    def drop(self, interview_id: str):
+        entry = self.items.pop(interview_id, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+    def stats(self):
+        return {"entries": len(self.items), "bytes": self.size}
+
+tts_cache = TTSCache()
+pending_audio = PendingAudio()
@@ -0,0 +1,170 @@
+import os
+import json
+import asyncio
+import websockets
+from dotenv import load_dotenv
+
+load_dotenv()
+
+INWORLD_API_KEY = os.getenv("INWORLD_API_KEY")
+INWORLD_URL = os.getenv("INWORLD_URL", "wss://api.inworld.ai/tts/v1/voice:streamBidirectional")
+
+TTS_POOL_SIZE = int(os.getenv("TTS_POOL_SIZE", "8"))
+TTS_CONTEXTS_PER_CONN = int(os.getenv("TTS_CONTEXTS_PER_CONN", "5"))
+TTS_POOL_WARM = int(os.getenv("TTS_POOL_WARM", "1"))  # sockets opened at startup
+TTS_ACQUIRE_TIMEOUT_SEC = float(os.getenv("TTS_ACQUIRE_TIMEOUT_SEC", "10"))
+
+class ConnectionLost(Exception):
+    pass
+
+class PoolExhausted(Exception):
+    pass
+
+_LOST = object()
+
+class InworldConnection:
+    """
+    One long-lived Inworld websocket. Many contexts share it; every incoming
+    message is routed to the queue registered for its context id.
+    """
+    def __init__(self):
+        self.ws = None
+        self.contexts = {}
+        self.reader = None
+        self.alive = False
+
+    async def connect(self):
+        headers = {"Authorization": f"Basic {INWORLD_API_KEY}"}
+        self.ws = await websockets.connect(INWORLD_URL, extra_headers=headers, max_size=None)
+        self.alive = True
+        self.reader = asyncio.create_task(self._route())
+
+    async def send(self, payload: dict):
+        if not self.alive:
+            raise ConnectionLost("Inworld connection is closed")
+        try:
+            await self.ws.send(json.dumps(payload))
+        except websockets.ConnectionClosed as e:
+            self._mark_dead()
+            raise ConnectionLost(str(e))
+
+    async def _route(self):
+        try:
+            async for msg in self.ws:
+                try:
+                    data = json.loads(msg)
+                except Exception:
+                    continue
+                result = data.get("result") or data.get("error") or {}
+                ctx = result.get("contextId") or data.get("contextId") or data.get("context_id")
+                q = self.contexts.get(ctx)
+                if q is not None:
+                    q.put_nowait(data)
+                elif data.get("error"):
+                    print("Inworld error:", data["error"])
+        except Exception as e:
+            print("Inworld connection lost:", e)
+        finally:
+            self._mark_dead()
+
+    def _mark_dead(self):
+        if not self.alive:
+            return
+        self.alive = False
+        for q in self.contexts.values():
+            q.put_nowait(_LOST)
+
+    async def close(self):
+        self._mark_dead()
+        if self.reader:
+            self.reader.cancel()
+        if self.ws:
+            await self.ws.close()
+
+class InworldPool:
+    """
+    Process-wide pool of warm Inworld sockets, each multiplexing up to
+    TTS_CONTEXTS_PER_CONN contexts. Dead sockets are dropped and replaced lazily.
+    """
+    def __init__(self, size: int = TTS_POOL_SIZE, contexts_per_conn: int = TTS_CONTEXTS_PER_CONN):
+        self.size = size
+        self.contexts_per_conn = contexts_per_conn
+        self.conns = []
+        self.cond = asyncio.Condition()
+        self.connecting = 0
+
+    async def start(self, warm: int = TTS_POOL_WARM):
+        if not INWORLD_API_KEY:
+            return
+        for _ in range(min(warm, self.size)):
+            try:
+                conn = InworldConnection()
+                await conn.connect()
+                self.conns.append(conn)
+            except Exception as e:
+                print("Inworld warm-up failed:", e)
+
+    async def _acquire(self, timeout: float = TTS_ACQUIRE_TIMEOUT_SEC):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        async with self.cond:
+            while True:
+                self.conns = [c for c in self.conns if c.alive]
+                free = [c for c in self.conns if len(c.contexts) < self.contexts_per_conn]
+                if free:
+                    return min(free, key=lambda c: len(c.contexts)), False
+                if len(self.conns) + self.connecting < self.size:
+                    self.connecting += 1
+                    return None, True
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise PoolExhausted(f"No Inworld context free after {timeout}s")
+                try:
+                    await asyncio.wait_for(self.cond.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def open_context(self, context_id: str, create: dict):
+        """Creates a context on a pooled socket and returns (connection, message queue)."""
+        conn, needs_connect = await self._acquire()
+        if needs_connect:
+            conn = InworldConnection()
+            try:
+                await conn.connect()
+            finally:
+                async with self.cond:
+                    self.connecting -= 1
+                    if conn.alive:
+                        self.conns.append(conn)
+                    self.cond.notify_all()
+
+        q = asyncio.Queue()
+        conn.contexts[context_id] = q
+        try:
+            await conn.send({"context_id": context_id, "create": create})
+        except ConnectionLost:
+            await self.release(conn, context_id)
+            raise
+        return conn, q
+
+    async def release(self, conn: InworldConnection, context_id: str):
+        async with self.cond:
+            conn.contexts.pop(context_id, None)
+            self.cond.notify_all()
+
+    def stats(self):
+        live = [c for c in self.conns if c.alive]
+        return {"connections": len(live), "contexts": sum(len(c.contexts) for c in live)}
+
+    async def close(self):
+        for conn in self.conns:
+            await conn.close()
+        self.conns = []
+
+tts_pool = InworldPool()
+
+async def next_message(q: asyncio.Queue):
+    msg = await q.get()
+    if msg is _LOST:
+        raise ConnectionLost("Inworld connection dropped mid-utterance")
+    return msg
@@ -0,0 +1,104 @@
+import os
+import time
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+VAD_ENABLED = os.getenv("VAD_ENABLED", "1") == "1"
+VAD_FRAME_MS = int(os.getenv("VAD_FRAME_MS", "20"))
+VAD_MIN_RMS = float(os.getenv("VAD_MIN_RMS", "300"))        # int16 scale, about -40 dBFS
+VAD_NOISE_RATIO = float(os.getenv("VAD_NOISE_RATIO", "3.0"))  # speech must be this much above the noise floor
+VAD_MAX_ZCR = float(os.getenv("VAD_MAX_ZCR", "0.35"))         # broadband noise crosses zero far more often than voice
+# Keep forwarding this long after speech so AssemblyAI still hears the silence that ends a turn
+VAD_HANGOVER_MS = int(os.getenv("VAD_HANGOVER_MS", "1300"))
+VAD_KEEPALIVE_SEC = float(os.getenv("VAD_KEEPALIVE_SEC", "2.0"))
+VAD_KEEPALIVE_MS = 50
+
+class VADStats:
+    """Process-wide counters: how much audio the VAD kept away from STT."""
+    def __init__(self):
+        self.chunks = 0
+        self.forwarded = 0
+        self.keepalives = 0
+        self.dropped_bytes = 0
+
+    def stats(self):
+        return {
+            "chunks": self.chunks,
+            "forwarded": self.forwarded,
+            "keepalives": self.keepalives,
+            "dropped_bytes": self.dropped_bytes,
+            "drop_rate": round(1 - self.forwarded / self.chunks, 3) if self.chunks else 0.0,
+        }
+
+vad_stats = VADStats()
+
+class VoiceActivityDetector:
+    """
+    Energy + zero-crossing VAD over 16-bit mono PCM. The noise floor adapts on
+    non-speech frames, so a noisy room raises the threshold instead of keeping
+    the stream open.
+    """
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = VAD_FRAME_MS):
+        self.frame = sample_rate * frame_ms // 1000
+        self.keepalive = bytes(sample_rate * VAD_KEEPALIVE_MS // 1000 * 2)
+        self.noise_floor = VAD_MIN_RMS / VAD_NOISE_RATIO
+        self.last_speech_ts = None
+        self.last_sent_ts = 0.0
+
+    def is_speech(self, pcm: bytes):
+        samples = np.frombuffer(pcm, dtype=np.int16, count=len(pcm) // 2)
+        n = len(samples) // self.frame
+        if not n:
+            return False
+        frames = samples[:n * self.frame].reshape(n, self.frame).astype(np.float32)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        zcr = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+
+        threshold = max(VAD_MIN_RMS, self.noise_floor * VAD_NOISE_RATIO)
+        speech = (rms > threshold) & (zcr < VAD_MAX_ZCR)
+        quiet = rms[~speech]
+        if len(quiet):
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * float(np.median(quiet))
+        return bool(speech.any())
+
+    def update(self, pcm: bytes, now: float = None):
+        """Classifies a chunk without deciding what to send (e.g. while audio is gated)."""
+        speech = self.is_speech(pcm)
+        if speech:
+            self.last_speech_ts = now or time.time()
+        return speech
+
+    def filter(self, pcm: bytes, now: float = None):
+        """Returns what to send upstream for this chunk: the chunk, a keepalive, or None."""
+        now = now or time.time()
+        vad_stats.chunks += 1
+        self.update(pcm, now)
+        if self.last_speech_ts and now - self.last_speech_ts <= VAD_HANGOVER_MS / 1000:
+            self.last_sent_ts = now
+            vad_stats.forwarded += 1
+            return pcm
+        vad_stats.dropped_bytes += len(pcm)
+        if now - self.last_sent_ts >= VAD_KEEPALIVE_SEC:
+            self.last_sent_ts = now
+            vad_stats.keepalives += 1
+            return self.keepalive
+        return None
+
+    def speaking(self, now: float = None):
+        """True if speech was heard in the last 250 ms."""
+        return self.last_speech_ts is not None and (now or time.time()) - self.last_speech_ts < 0.25
+
+    def silence_delay(self, silence_sec: float, now: float = None):
+        """
+        Time left until `silence_sec` of silence, counted from the end of local
+        speech instead of from the transcript, which arrives later.
+        """
+        if self.last_speech_ts is None:
+            return silence_sec
+        since = (now or time.time()) - self.last_speech_ts
+        # Transcript for speech the VAD missed (too quiet): fall back to the transcript clock
+        if since > VAD_HANGOVER_MS / 1000:
+            return silence_sec
+        return silence_sec - since
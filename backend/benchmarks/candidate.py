@@ -0,0 +1,82 @@
+"""Simulated candidate: answers each question with synthetic speech over /ws/interview."""
+import json
+import time
+import asyncio
+import numpy as np
+import websockets
+
+SAMPLE_RATE = 16000
+CHUNK_MS = 80  # about what the browser's audio worklet sends per message
+
+def _tone(ms: int, amplitude: float, freq: float = 180.0):
+    t = np.arange(SAMPLE_RATE * ms // 1000) / SAMPLE_RATE
+    # A little harmonic content keeps the zero-crossing rate speech-like
+    wave = np.sin(2 * np.pi * freq * t) + 0.3 * np.sin(2 * np.pi * 3 * freq * t)
+    return (amplitude * wave).astype(np.int16).tobytes()
+
+SPEECH_CHUNK = _tone(CHUNK_MS, 4000)
+SILENCE_CHUNK = (np.random.default_rng(0).normal(0, 20, SAMPLE_RATE * CHUNK_MS // 1000)).astype(np.int16).tobytes()
+
+class Candidate:
+    """
+    Waits for a question, lets its reading time pass, talks for `answer_sec`,
+    then stays quiet (sending silence, as a live microphone does) until the
+    next reply's first audio frame arrives. That gap is the turn latency.
+    """
+    def __init__(self, base_url: str, interview_id: str, turns: int, answer_sec: float,
+                 turn_timeout_sec: float = 30.0, audio_format: str = "pcm16"):
+        self.url = f"{base_url}/ws/interview?interview_id={interview_id}&audio_format={audio_format}"
+        self.turns = turns
+        self.answer_sec = answer_sec
+        self.turn_timeout_sec = turn_timeout_sec
+        self.latencies = []
+        self.errors = []
+        self.replies = asyncio.Queue()
+        self.first_audio = None
+        self.speech_end = None
+
+    async def run(self):
+        try:
+            async with websockets.connect(self.url, max_size=None) as ws:
+                reader = asyncio.create_task(self._read(ws))
+                try:
+                    await self._converse(ws)
+                finally:
+                    reader.cancel()
+        except Exception as e:
+            self.errors.append(repr(e))
+
+    async def _read(self, ws):
+        async for msg in ws:
+            if isinstance(msg, bytes):
+                if self.speech_end is not None and self.first_audio is None:
+                    self.first_audio = time.perf_counter()
+                continue
+            data = json.loads(msg)
+            if data.get("type") == "ai_response":
+                self.replies.put_nowait(data)
+
+    async def _stream(self, chunk: bytes, seconds: float, ws, until=None):
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline and not (until and until()):
+            await ws.send(chunk)
+            await asyncio.sleep(CHUNK_MS / 1000)
+
+    async def _converse(self, ws):
+        reply = await asyncio.wait_for(self.replies.get(), self.turn_timeout_sec)
+        for _ in range(self.turns):
+            if reply.get("is_final"):
+                return
+            # The server ignores audio while the reply is being read
+            await self._stream(SILENCE_CHUNK, reply.get("reading_time", 4) + 0.3, ws)
+
+            await self._stream(SPEECH_CHUNK, self.answer_sec, ws)
+            self.first_audio = None
+            self.speech_end = time.perf_counter()
+            await self._stream(SILENCE_CHUNK, self.turn_timeout_sec, ws, until=lambda: self.first_audio is not None)
+            if self.first_audio is None:
+                self.errors.append("no reply audio before timeout")
+                return
+            self.latencies.append(self.first_audio - self.speech_end)
+            self.speech_end = None
+            reply = await asyncio.wait_for(self.replies.get(), self.turn_timeout_sec)
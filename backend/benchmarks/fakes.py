@@ -0,0 +1,208 @@
+"""
+Local stand-ins for the paid upstreams, speaking just enough of each protocol
+for interview_ws: AssemblyAI v3 streaming STT, Groq's OpenAI-compatible chat
+completions, and Inworld bidirectional TTS.
+"""
+import json
+import time
+import uuid
+import base64
+import asyncio
+import numpy as np
+import websockets
+from aiohttp import web
+
+WORDS = "so I would start by looking at the data model and then the access patterns".split()
+
+class FakeAssemblyAI:
+    """
+    Turns incoming 16 kHz PCM into Turn messages: partials while the audio is
+    loud, then end_of_turn after `end_silence_ms` of quiet audio.
+    """
+    def __init__(self, port: int, partial_ms: int = 300, end_silence_ms: int = 500,
+                 ms_per_word: int = 250, speech_rms: float = 500):
+        self.port = port
+        self.partial_ms = partial_ms
+        self.end_silence_ms = end_silence_ms
+        self.ms_per_word = ms_per_word
+        self.speech_rms = speech_rms
+        self.server = None
+        self.sockets = 0
+        self.audio_bytes = 0
+
+    async def start(self):
+        self.server = await websockets.serve(self._handle, "127.0.0.1", self.port, max_size=None)
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def _transcript(self, speech_ms):
+        n = max(1, int(speech_ms // self.ms_per_word))
+        return " ".join(WORDS[i % len(WORDS)] for i in range(n))
+
+    async def _handle(self, ws, path=None):
+        self.sockets += 1
+        await ws.send(json.dumps({"type": "Begin", "id": uuid.uuid4().hex, "expires_at": int(time.time()) + 3600}))
+        speech_ms = silence_ms = 0.0
+        last_partial = 0.0
+        try:
+            async for msg in ws:
+                if isinstance(msg, str):
+                    continue
+                self.audio_bytes += len(msg)
+                samples = np.frombuffer(msg, dtype=np.int16, count=len(msg) // 2).astype(np.float32)
+                ms = len(samples) / 16
+                loud = len(samples) and np.sqrt(np.mean(samples * samples)) > self.speech_rms
+                if loud:
+                    speech_ms += ms
+                    silence_ms = 0.0
+                    now = time.monotonic()
+                    if now - last_partial >= self.partial_ms / 1000:
+                        last_partial = now
+                        await ws.send(json.dumps({"type": "Turn", "transcript": self._transcript(speech_ms), "end_of_turn": False}))
+                elif speech_ms:
+                    silence_ms += ms
+                    if silence_ms >= self.end_silence_ms:
+                        await ws.send(json.dumps({"type": "Turn", "transcript": self._transcript(speech_ms), "end_of_turn": True}))
+                        speech_ms = silence_ms = 0.0
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.sockets -= 1
+
+class FakeLLM:
+    """
+    POST /openai/v1/chat/completions with a configurable time to first token
+    and per-token delay. Streaming responses end with x_groq usage like Groq's.
+    """
+    def __init__(self, port: int, ttft_ms: int = 300, token_ms: int = 15, reply_tokens: int = 40):
+        self.port = port
+        self.ttft_ms = ttft_ms
+        self.token_ms = token_ms
+        self.reply_tokens = reply_tokens
+        self.runner = None
+        self.requests = 0
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/openai/v1/chat/completions", self._chat)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", self.port).start()
+
+    async def close(self):
+        await self.runner.cleanup()
+
+    def _reply(self, body):
+        if body.get("response_format", {}).get("type") == "json_object":
+            return json.dumps({
+                "rating": 7, "technicalScore": 7, "communicationScore": 7, "englishScore": 8,
+                "note": "Solid answer.", "feedbackText": "Benchmark feedback.",
+            })
+        words = [WORDS[i % len(WORDS)] for i in range(self.reply_tokens)]
+        # Two sentences, so the sentence chunker hands TTS something early
+        half = len(words) // 2
+        return " ".join(words[:half]) + ". " + " ".join(words[half:]) + "?"
+
+    async def _chat(self, request):
+        self.requests += 1
+        body = await request.json()
+        prompt_tokens = sum(len(m.get("content") or "") for m in body.get("messages", [])) // 4
+        text = self._reply(body)
+        base = {"id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "created": int(time.time()), "model": body.get("model", "fake")}
+        await asyncio.sleep(self.ttft_ms / 1000)
+
+        if not body.get("stream"):
+            return web.json_response({
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(text) // 4, "total_tokens": prompt_tokens + len(text) // 4},
+            })
+
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resp.prepare(request)
+        tokens = [t + " " for t in text.split(" ")]
+        for i, token in enumerate(tokens):
+            chunk = {**base, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}
+            await resp.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            if i + 1 < len(tokens):
+                await asyncio.sleep(self.token_ms / 1000)
+        final = {**base, "object": "chat.completion.chunk",
+                 "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                 "x_groq": {"id": base["id"], "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+                                                       "total_tokens": prompt_tokens + len(tokens)}}}
+        await resp.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode())
+        await resp.write_eof()
+        return resp
+
+class FakeInworld:
+    """
+    Bidirectional TTS: every send_text yields `ms_per_char` of PCM per character,
+    in `chunk_ms` chunks after `ttfb_ms`; close_context answers contextClosed.
+    """
+    def __init__(self, port: int, ttfb_ms: int = 150, ms_per_char: int = 60, chunk_ms: int = 100,
+                 sample_rate: int = 24000):
+        self.port = port
+        self.ttfb_ms = ttfb_ms
+        self.ms_per_char = ms_per_char
+        self.chunk_ms = chunk_ms
+        self.sample_rate = sample_rate
+        self.server = None
+        self.sockets = 0
+
+    async def start(self):
+        self.server = await websockets.serve(self._handle, "127.0.0.1", self.port, max_size=None)
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _speak(self, ws, ctx, text, previous, done):
+        await asyncio.sleep(self.ttfb_ms / 1000)
+        # Sentences of one context come back in order
+        if previous is not None:
+            await previous.wait()
+        total_ms = len(text) * self.ms_per_char
+        t = np.arange(self.sample_rate * self.chunk_ms // 1000) / self.sample_rate
+        chunk = base64.b64encode((2000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16).tobytes()).decode()
+        try:
+            for _ in range(max(1, total_ms // self.chunk_ms)):
+                await ws.send(json.dumps({"result": {"contextId": ctx, "audioChunk": {"audioContent": chunk}}}))
+                # Synthesis runs faster than real time, like the real service
+                await asyncio.sleep(self.chunk_ms / 4000)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            done.set()
+
+    async def _handle(self, ws, path=None):
+        self.sockets += 1
+        pending = {}  # context id -> tasks still producing audio
+        try:
+            async for msg in ws:
+                d = json.loads(msg)
+                ctx = d.get("context_id")
+                if "create" in d:
+                    pending[ctx] = []
+                elif "send_text" in d:
+                    done = asyncio.Event()
+                    events = pending.setdefault(ctx, [])
+                    asyncio.create_task(self._speak(ws, ctx, d["send_text"].get("text", ""), events[-1] if events else None, done))
+                    events.append(done)
+                elif "close_context" in d:
+                    asyncio.create_task(self._close(ws, ctx, pending.pop(ctx, [])))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.sockets -= 1
+
+    async def _close(self, ws, ctx, events):
+        for e in events:
+            await e.wait()
+        try:
+            await ws.send(json.dumps({"result": {"contextId": ctx, "contextClosed": {}}}))
+        except websockets.ConnectionClosed:
+            pass
@@ -0,0 +1,201 @@
+"""
+Offline load test for /ws/interview.
+
+    cd backend
+    python -m benchmarks.run --candidates 20 --turns 3
+    python -m benchmarks.run --ramp 10,10,80 --slo-ms 2500
+
+Starts fake AssemblyAI / Groq / Inworld servers, a throwaway SQLite database
+and one interview worker (benchmarks.server), then drives simulated candidates
+and reports turn latency percentiles, peak live sessions and event-loop lag.
+Its SQLite driver (aiosqlite) is listed in requirements.txt.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import httpx
+
+from benchmarks.fakes import FakeAssemblyAI, FakeLLM, FakeInworld
+from benchmarks.candidate import Candidate
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else None
+
+async def create_interviews(n: int, silence_sec: float):
+    # Imported late: app.core.database reads DATABASE_URL at import time
+    from app.core.database import engine, Base, AsyncSessionLocal
+    from app.models import User, Interview
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        user = User(name="Benchmark", email=f"bench-{time.time_ns()}@example.com")
+        db.add(user)
+        await db.flush()
+        interviews = [
+            Interview(userId=user.id, topic="System Design", duration=15, difficulty="Medium",
+                      seniority="Mid-Level", silenceTime=silence_sec, status="CREATED")
+            for _ in range(n)
+        ]
+        db.add_all(interviews)
+        await db.commit()
+        return [i.id for i in interviews]
+
+async def wait_ready(url: str, proc, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as http:
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError("benchmark server exited during startup")
+            try:
+                if (await http.get(url)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("benchmark server did not start")
+
+async def watch_sessions(http, url: str, peak: list):
+    while True:
+        try:
+            text = (await http.get(f"{url}/metrics")).text
+            for line in text.splitlines():
+                if line.startswith("interview_live_sessions "):
+                    peak[0] = max(peak[0], int(float(line.split()[1])))
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+
+async def run_round(http_url: str, ws_url: str, n: int, args):
+    ids = await create_interviews(n, args.silence_sec)
+    candidates = [Candidate(ws_url, i, args.turns, args.answer_sec, audio_format=args.audio_format) for i in ids]
+    peak = [0]
+    async with httpx.AsyncClient() as http:
+        await http.get(f"{http_url}/_bench/loop_lag", params={"reset": True})
+        watcher = asyncio.create_task(watch_sessions(http, http_url, peak))
+        started = time.perf_counter()
+
+        async def staggered(i, c):
+            # Spread connects over a second so every session doesn't hit the same phase
+            await asyncio.sleep(i / max(1, n))
+            await c.run()
+
+        await asyncio.gather(*(staggered(i, c) for i, c in enumerate(candidates)))
+        elapsed = time.perf_counter() - started
+        watcher.cancel()
+        lag = (await http.get(f"{http_url}/_bench/loop_lag")).json()
+
+    latencies = [l for c in candidates for l in c.latencies]
+    errors = [e for c in candidates for e in c.errors]
+    ms = lambda v: round(v * 1000) if v is not None else None
+    return {
+        "candidates": n,
+        "turns": len(latencies),
+        "errors": len(errors),
+        "error_samples": errors[:3],
+        "turn_latency_ms": {
+            "p50": ms(percentile(latencies, 0.5)),
+            "p95": ms(percentile(latencies, 0.95)),
+            "p99": ms(percentile(latencies, 0.99)),
+            "max": ms(max(latencies) if latencies else None),
+        },
+        "peak_live_sessions": peak[0],
+        "loop_lag": lag,
+        "elapsed_sec": round(elapsed, 1),
+    }
+
+def print_round(r):
+    lat = r["turn_latency_ms"]
+    lag = r["loop_lag"]
+    print(f"{r['candidates']:>5} candidates | turns {r['turns']:>4} | errors {r['errors']:>3} | "
+          f"latency p50 {lat['p50']} p95 {lat['p95']} p99 {lat['p99']} max {lat['max']} ms | "
+          f"peak sessions {r['peak_live_sessions']} | loop lag p99 {lag.get('p99_ms')} max {lag.get('max_ms')} ms")
+    for e in r["error_samples"]:
+        print(f"      error: {e}")
+
+async def main(args):
+    tmp = tempfile.mkdtemp(prefix="interview-bench-")
+    ports = {name: free_port() for name in ("server", "stt", "llm", "tts")}
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tmp}/bench.db"
+
+    stt = FakeAssemblyAI(ports["stt"])
+    llm = FakeLLM(ports["llm"], ttft_ms=args.llm_ttft_ms, token_ms=args.llm_token_ms)
+    tts = FakeInworld(ports["tts"], ttfb_ms=args.tts_ttfb_ms)
+    for fake in (stt, llm, tts):
+        await fake.start()
+
+    env = {
+        **os.environ,
+        "ASSEMBLYAI_URL": f"ws://127.0.0.1:{ports['stt']}/v3/ws",
+        "ASSEMBLYAI_API_KEY": "bench",
+        "GROQ_BASE_URL": f"http://127.0.0.1:{ports['llm']}",
+        "GROQ_API_KEY": "bench",
+        "INWORLD_URL": f"ws://127.0.0.1:{ports['tts']}",
+        "INWORLD_API_KEY": "bench",
+        "TTS_CACHE_DIR": "",
+        "TTS_PREWARM_TOPICS": "",
+        "FEEDBACK_BACKLOG_PATH": "",
+        "SESSION_STORE": "memory",
+    }
+    proc = subprocess.Popen([sys.executable, "-m", "benchmarks.server", "--port", str(ports["server"])],
+                            env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    http_url = f"http://127.0.0.1:{ports['server']}"
+    ws_url = f"ws://127.0.0.1:{ports['server']}"
+    results = []
+    try:
+        await wait_ready(http_url, proc)
+        if args.ramp:
+            start, step, stop = (int(x) for x in args.ramp.split(","))
+            sizes = range(start, stop + 1, step)
+        else:
+            sizes = [args.candidates]
+        for n in sizes:
+            r = await run_round(http_url, ws_url, n, args)
+            results.append(r)
+            print_round(r)
+            p95 = r["turn_latency_ms"]["p95"]
+            if args.ramp and (r["errors"] or p95 is None or p95 > args.slo_ms):
+                break
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        for fake in (stt, llm, tts):
+            await fake.close()
+
+    if args.ramp:
+        ok = [r for r in results if not r["errors"] and r["turn_latency_ms"]["p95"] is not None
+              and r["turn_latency_ms"]["p95"] <= args.slo_ms]
+        print(f"Max candidates per worker within p95 <= {args.slo_ms} ms: {ok[-1]['candidates'] if ok else 0}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline load test for the interview websocket.")
+    parser.add_argument("--candidates", type=int, default=10)
+    parser.add_argument("--ramp", help="start,step,stop: grow the candidate count until the SLO breaks")
+    parser.add_argument("--slo-ms", type=int, default=2500, help="p95 turn latency budget for --ramp")
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--answer-sec", type=float, default=2.0)
+    parser.add_argument("--silence-sec", type=float, default=1.0, help="interview silenceTime")
+    parser.add_argument("--audio-format", default="pcm16", choices=("wav", "pcm16", "mulaw"))
+    parser.add_argument("--llm-ttft-ms", type=int, default=300)
+    parser.add_argument("--llm-token-ms", type=int, default=15)
+    parser.add_argument("--tts-ttfb-ms", type=int, default=150)
+    parser.add_argument("--json", help="also write the results to this file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,44 @@
+"""
+One interview worker for benchmarks: the real app plus an event-loop lag probe.
+The runner starts it as a subprocess with every upstream pointed at the fakes.
+"""
+import time
+import asyncio
+import argparse
+from collections import deque
+import uvicorn
+
+from app.main import app
+
+LAG_INTERVAL_SEC = 0.05
+lag_samples = deque(maxlen=100_000)
+
+async def sample_loop_lag():
+    # A sleep that wakes late measures how long something else held the loop
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL_SEC)
+        lag_samples.append(max(0.0, time.perf_counter() - start - LAG_INTERVAL_SEC))
+
+@app.get("/_bench/loop_lag")
+def loop_lag(reset: bool = False):
+    values = sorted(lag_samples)
+    if reset:
+        lag_samples.clear()
+    if not values:
+        return {"samples": 0}
+    pick = lambda q: round(values[min(len(values) - 1, int(len(values) * q))] * 1000, 2)
+    return {"samples": len(values), "p50_ms": pick(0.5), "p99_ms": pick(0.99), "max_ms": round(values[-1] * 1000, 2)}
+
+async def main(port: int):
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    probe = asyncio.create_task(sample_loop_lag())
+    try:
+        await server.serve()
+    finally:
+        probe.cancel()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8000)
+    asyncio.run(main(parser.parse_args().port))
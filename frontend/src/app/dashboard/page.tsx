@@ -25,13 +25,13 @@ interface Interview {
     createdAt: string;
     feedback?: {
         rating: number;
-        feedbackText: string;
     };
 }
 
 export default function Dashboard() {
     const { data: session, status } = useSession();
     const [interviews, setInterviews] = useState<Interview[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
     const [loading, setLoading] = useState(true);
     const [submitLoading, setSubmitLoading] = useState(false);
     const [isCreating, setIsCreating] = useState(false);
@@ -53,11 +53,13 @@ export default function Dashboard() {
         }
     }, [session]);
 
-    const fetchInterviews = async () => {
+    const fetchInterviews = async (cursor?: string) => {
         try {
             const userId = (session?.user as any)?.id || session?.user?.email;
-            const res = await axios.get(`${process.env.NEXT_PUBLIC_BACKEND_URL}/api/interview?userId=${userId}`);
-            setInterviews(res.data);
+            const page = cursor ? `&cursor=${encodeURIComponent(cursor)}` : "";
+            const res = await axios.get(`${process.env.NEXT_PUBLIC_BACKEND_URL}/api/interview?userId=${userId}${page}`);
+            setInterviews((prev) => (cursor ? [...prev, ...res.data] : res.data));
+            setNextCursor(res.headers["x-next-cursor"] || null);
         } catch (e) {
             console.error(e);
         } finally {
@@ -225,6 +227,14 @@ export default function Dashboard() {
                                             </div>
                                         </Link>
                                     ))}
+                                    {nextCursor && (
+                                        <button
+                                            onClick={() => fetchInterviews(nextCursor)}
+                                            className="w-full py-3 text-sm font-bold text-slate-400 hover:text-emerald-600 transition-colors"
+                                        >
+                                            Load more
+                                        </button>
+                                    )}
                                 </div>
                             )}
                         </div>
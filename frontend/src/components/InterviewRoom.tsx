@@ -28,6 +28,10 @@ export default function InterviewRoom({
   const socketRef = useRef<WebSocket | null>(null);
   const audioCtxRef = useRef<AudioContext | null>(null);
   const nextPlayTimeRef = useRef<number>(0);
+  // Sources scheduled but not yet finished, and a counter bumped on audio_cancelled
+  const scheduledRef = useRef<Set<AudioBufferSourceNode>>(new Set());
+  const playbackGenRef = useRef(0);
+  const audioMetaRef = useRef<{ format?: string; sample_rate?: number; utterance_id?: number }>({});
   const aiLockedRef = useRef(true);
   const { reset } = usePassStore();
 
@@ -76,7 +80,7 @@ export default function InterviewRoom({
 
   const start = async () => {
     const ws = new WebSocket(
-      `${process.env.NEXT_PUBLIC_BACKEND_URL?.replace("http", "ws")}/ws/interview?interview_id=${interviewId}`,
+      `${process.env.NEXT_PUBLIC_BACKEND_URL?.replace("http", "ws")}/ws/interview?interview_id=${interviewId}&audio_format=pcm16`,
     );
     ws.binaryType = "arraybuffer";
     socketRef.current = ws;
@@ -164,7 +168,22 @@ export default function InterviewRoom({
         try {
           const ctx = audioCtxRef.current;
           if (!ctx) return;
-          const audioBuffer = await ctx.decodeAudioData(e.data.slice(0));
+          let audioBuffer: AudioBuffer;
+          const meta = audioMetaRef.current;
+          const generation = playbackGenRef.current;
+          if (meta.format === "pcm16") {
+            // 4-byte header: uint16 utterance id + uint16 sequence, then raw PCM
+            const header = new DataView(e.data, 0, 4);
+            if (header.getUint16(0, true) !== meta.utterance_id) return;
+            const pcm = new Int16Array(e.data, 4);
+            audioBuffer = ctx.createBuffer(1, pcm.length, meta.sample_rate || 24000);
+            const channel = audioBuffer.getChannelData(0);
+            for (let i = 0; i < pcm.length; i++) channel[i] = pcm[i] / 32768;
+          } else {
+            audioBuffer = await ctx.decodeAudioData(e.data.slice(0));
+          }
+          // Cancelled while this chunk was decoding
+          if (generation !== playbackGenRef.current) return;
           const source = ctx.createBufferSource();
           source.buffer = audioBuffer;
           source.connect(ctx.destination);
@@ -172,6 +191,7 @@ export default function InterviewRoom({
           const start = Math.max(nextPlayTimeRef.current, ctx.currentTime);
           source.start(start);
           nextPlayTimeRef.current = start + audioBuffer.duration;
+          scheduledRef.current.add(source);
 
           setAiTextPending((pending) => {
             if (pending) {
@@ -186,6 +206,7 @@ export default function InterviewRoom({
           aiLockedRef.current = true;
 
           source.onended = () => {
+            scheduledRef.current.delete(source);
             if (ctx.currentTime + 0.2 >= nextPlayTimeRef.current) {
               setTimeout(() => {
                 if (ctx.currentTime + 0.2 >= nextPlayTimeRef.current) {
@@ -204,6 +225,21 @@ export default function InterviewRoom({
 
       try {
         const data = JSON.parse(e.data);
+        if (data.type === "audio_meta") {
+          audioMetaRef.current = data;
+        }
+        if (data.type === "audio_cancelled") {
+          // Barge-in or a newer utterance: silence what is already queued on the AudioContext
+          playbackGenRef.current += 1;
+          scheduledRef.current.forEach((source) => {
+            try { source.stop(); } catch (err) { }
+          });
+          scheduledRef.current.clear();
+          nextPlayTimeRef.current = audioCtxRef.current?.currentTime ?? 0;
+          if (audioMetaRef.current.utterance_id === data.utterance_id) {
+            audioMetaRef.current = { ...audioMetaRef.current, utterance_id: undefined };
+          }
+        }
         if (data.type === "ai_response") {
           aiLockedRef.current = true;
           setAiSpeaking(true);
@@ -217,6 +253,13 @@ export default function InterviewRoom({
             return;
           }
         }
+        if (data.type === "capacity") {
+          setCurrentSubtitle(
+            data.status === "queued"
+              ? `All interviewers are busy. You're #${data.position} in line (about ${data.estimated_wait_sec}s).`
+              : `All interviewers are busy. Please try again in about ${data.retry_after_sec}s.`
+          );
+        }
         if (data.type === "stt_partial") {
           setCurrentSubtitle(data.text);
         }
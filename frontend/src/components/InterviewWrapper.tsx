@@ -22,6 +22,19 @@ export default function InterviewWrapper({ interviewId }: { interviewId: string
         fetchInfo();
     }, [interviewId]);
 
+    // Feedback is still being generated: wait for the push instead of re-fetching the interview
+    const waitingForFeedback = data?.status === "COMPLETED" && !data?.feedback;
+    useEffect(() => {
+        if (!waitingForFeedback) return;
+        const events = new EventSource(`${process.env.NEXT_PUBLIC_BACKEND_URL}/api/interview/${interviewId}/feedback/events`);
+        events.addEventListener("feedback", (e) => {
+            setData((prev: any) => ({ ...prev, feedback: JSON.parse((e as MessageEvent).data) }));
+            events.close();
+        });
+        events.addEventListener("timeout", () => events.close());
+        return () => events.close();
+    }, [interviewId, waitingForFeedback]);
+
     if (loading) {
         return (
             <div className="min-h-screen bg-[#FAFAFA] flex items-center justify-center">